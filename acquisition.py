@@ -0,0 +1,277 @@
+import queue
+import time
+
+import numpy as np
+import serial
+
+from uart_tokenizer import LineTokenizer
+from adaptive_sampling import plan_refinement, order_for_travel
+from frame_ring import FrameRing
+from session_io import SessionRecorder
+
+
+PORT_ALG = "/dev/ttyAMA2"   # UART2 (모터)
+PORT_MES = "/dev/ttyAMA3"   # 측정
+RES_CMD = "RES {n}\n"       # STM32 에 해상도 변경 요청
+
+MES_DELAY = 2.0      # MF 수신 후 MeS 까지 (s)
+SC_DELAY = 0.1       # 프레임 수신 후 다음 SC 까지 (s)
+POLL_PERIOD = 0.002  # 수집 루프 주기 (s)
+STATS_PERIOD = 1.0   # GUI 로 통계 보내는 주기 (s)
+
+
+# ============================================================
+# UART 수신/송신
+# ============================================================
+class UARTReceiver:
+    def __init__(self, port, baud=115200):
+        self.ser = serial.Serial(port, baudrate=baud, timeout=0.1)
+        self.tokenizer = LineTokenizer()
+        self.backlog = 0    # 마지막으로 읽을 때 쌓여 있던 바이트 수
+
+    # 쌓여 있는 바이트를 한 번에 읽어서 완성된 줄들만 반환 (남은 꼬리는 다음 호출로)
+    def read_lines(self):
+        try:
+            n = self.ser.in_waiting
+            data = self.ser.read(n) if n else b""
+        except (serial.SerialException, OSError):   # 장치가 빠지면 ioctl 이 EIO
+            return []
+        self.backlog = n
+        return self.tokenizer.feed(data)
+
+    def stats(self):
+        return dict(self.tokenizer.stats, backlog=self.backlog, partial=len(self.tokenizer.buf))
+
+    def send(self, msg):
+        try:
+            self.ser.write(msg.encode())
+        except:
+            pass
+
+
+# ============================================================
+# 스캔 진행 (SC/MF/MeS/RM/RF 순서) — GUI 와 분리된 프로세스에서 실행
+# ============================================================
+class ScanSequencer:
+    def __init__(self, ring, events, uart_alg, uart_mes, verbose=False):
+        self.ring = ring
+        self.events = events
+        self.verbose = verbose  # 줄 단위 로그를 GUI 로 보낼지
+        self.uart_alg = uart_alg
+        self.uart_mes = uart_mes
+        self.timers = []    # (실행 시각, 함수)
+
+        self.S = 0
+        self.SC = 0.0
+        self.C = 0
+        self.angle = 0.0        # 다음 프레임의 명령 각도 (deg)
+        self.plan = []          # 남은 측정 각도들 (모터 진행 순서)
+        self.scan_frames = []   # 이번 스캔의 (명령 각도, N×N 깊이 cm)
+        self.rounds_left = 0
+        self.continuous = False
+        self.grid_size = 8
+        self.params = {}
+        self.recorder = None    # 세션 기록 (params 에 record_dir 이 있을 때)
+        self.transmission_active = False
+        self.wait_for_rf = False
+
+    def emit(self, *event):
+        self.events.put(event)
+
+    def log(self, msg):
+        if self.verbose:
+            self.emit("log", msg)
+
+    def call_later(self, delay, fn):
+        self.timers.append((time.monotonic() + delay, fn))
+
+    def run_due(self):
+        now = time.monotonic()
+        due = [t for t in self.timers if t[0] <= now]
+        if due:
+            self.timers = [t for t in self.timers if t[0] > now]
+            for _, fn in sorted(due, key=lambda t: t[0]):
+                fn()
+
+    # --------------------------------------------------------
+    def start(self, params):
+        self.params = params
+        self.S = params["S"]
+        self.SC = 360 / self.S
+        self.C = 0
+        self.angle = 0.0
+        self.plan = [k * self.SC for k in range(1, self.S)]
+        self.scan_frames = []
+        self.continuous = params["continuous"]
+        self.rounds_left = params["rounds"]
+        self.grid_size = params["grid_size"]
+        self.timers = []
+        self.transmission_active = True
+        self.wait_for_rf = False
+
+        self.end_recording()
+        if params.get("record_dir"):
+            self.recorder = SessionRecorder(params["record_dir"], {
+                "grid_size": self.grid_size, "S": self.S, "fov_deg": params["fov"],
+                "continuous": self.continuous, "adaptive_rounds": self.rounds_left,
+            })
+            self.emit("session", self.recorder.path)
+
+        self.uart_mes.send(RES_CMD.format(n=self.grid_size))
+        self.emit("info", f"Transmission started: SC={self.SC:.2f}°")
+        # 첫 SC 전송
+        self.send_SC()
+
+    # 남은 계획을 비워서 현재 스텝 측정 후 RM 으로 종료
+    def stop(self):
+        self.continuous = False
+        self.rounds_left = 0
+        self.plan = []
+        self.emit("info", "Stopping after current step")
+
+    def end_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    # SC 전송 (step 을 주면 그만큼, 아니면 균일 간격 SC)
+    def send_SC(self, step=None):
+        if not self.transmission_active:
+            return
+        if step is None:
+            step = self.SC
+        msg = f"{step:.3f}\n"
+        self.uart_alg.send(msg)
+        self.log(f"TX(SC): {msg.strip()}")
+
+    # MeS 전송
+    def send_MeS(self):
+        self.uart_mes.send("MeS\n")
+        self.log("MeS sent")
+
+    # UART 수신 처리 (쌓인 줄을 전부 처리)
+    def poll(self):
+        waiting = self.wait_for_rf
+        rf_received = False
+        for line_alg in self.uart_alg.read_lines():
+            self.log(f"RX Alg: {line_alg}")
+            if line_alg == "RF":
+                if not waiting:
+                    self.transmission_active = False
+                self.wait_for_rf = False
+                rf_received = True
+                self.emit("rf")
+            elif line_alg == "MF" and not waiting:
+                self.log(f"MF received, triggering MeS in {MES_DELAY:g}s")
+                self.call_later(MES_DELAY, self.send_MeS)
+
+        if waiting or rf_received:
+            return
+
+        lines = self.uart_mes.read_lines()
+        if lines:
+            self.emit("rx", lines[-1])
+        for line_mes in lines:
+            self.log(f"RX MeS: {line_mes}")
+            dist_mm = self.uart_mes.tokenizer.parse_frame(
+                line_mes, self.grid_size**2, mm_per_cm=1.0)
+            if dist_mm is not None:
+                self.handle_frame(dist_mm)
+            if self.wait_for_rf:
+                break
+
+    # 측정 프레임 1개 처리: 링에 기록하고 다음 스텝 결정
+    def handle_frame(self, dist_mm):
+        n = self.grid_size
+        grid_mm = np.array(dist_mm, dtype=float)
+        grid_mm[~(grid_mm > 0)] = 0
+        grid_mm = np.minimum(grid_mm, 65535).astype(np.uint16)
+        seq = self.ring.write(self.angle, self.C, n, grid_mm)
+        if self.recorder is not None:
+            self.recorder.write(self.ring.slots[seq % len(self.ring)])
+
+        if self.rounds_left > 0:
+            depth = np.where(grid_mm > 0, grid_mm / 10.0, np.nan).reshape(n, n)
+            self.scan_frames.append((self.angle, depth))
+
+        self.C += 1
+        if not self.plan and self.rounds_left > 0:
+            self.replan_adaptive()
+        if not self.plan and self.continuous:
+            # 한 바퀴 끝 → 같은 스텝으로 다음 회전
+            self.plan = [k * self.SC for k in range(self.S)]
+            self.emit("revolution", self.C // self.S)
+        self.emit("progress", self.C, self.C + len(self.plan))
+
+        if self.plan:
+            # 다음 목표 각도까지 앞으로 도는 만큼 이동
+            target = self.plan.pop(0)
+            step = (target - self.angle) % 360
+            self.angle = target
+            self.call_later(SC_DELAY, lambda: self.send_SC(step))
+        else:
+            # RM 신호를 UART2로 전송
+            self.uart_alg.send("RM\n")
+            self.end_recording()
+            self.emit("scan_done")
+            self.transmission_active = False
+            self.wait_for_rf = True
+
+    # 지금까지의 프레임으로 추가 측정 각도 계획
+    def replan_adaptive(self):
+        self.rounds_left -= 1
+        angles = [a for a, _ in self.scan_frames]
+        depths = [d for _, d in self.scan_frames]
+        targets = plan_refinement(
+            angles, depths, self.params["span"],
+            rel_thresh=self.params["rel_thresh"], min_step=self.params["min_step"],
+            max_extra=self.S)
+        if not targets:
+            self.rounds_left = 0
+            return
+        self.plan = order_for_travel(targets, self.angle)
+        self.emit("info", f"Adaptive refinement: +{len(targets)} steps")
+
+
+# ============================================================
+# 수집 프로세스 진입점
+# ============================================================
+def run_acquisition(ring_name, commands, events, port_alg=PORT_ALG, port_mes=PORT_MES,
+                    verbose=False):
+    ring = seq = None
+    try:
+        ring = FrameRing(name=ring_name)
+        uart_alg = UARTReceiver(port_alg)
+        uart_mes = UARTReceiver(port_mes)
+        seq = ScanSequencer(ring, events, uart_alg, uart_mes, verbose)
+
+        next_stats = time.monotonic()
+        while True:
+            try:
+                while True:
+                    cmd = commands.get_nowait()
+                    if cmd[0] == "start":
+                        seq.start(cmd[1])
+                    elif cmd[0] == "stop":
+                        seq.stop()
+                    elif cmd[0] == "quit":
+                        return
+            except queue.Empty:
+                pass
+
+            seq.poll()
+            seq.run_due()
+
+            if time.monotonic() >= next_stats:
+                next_stats += STATS_PERIOD
+                seq.emit("stats", {"alg": uart_alg.stats(), "mes": uart_mes.stats()})
+
+            time.sleep(POLL_PERIOD)
+    except Exception as e:
+        # 포트 열기 실패나 처리 중 예외 → GUI 에 알리고 종료 (조용히 죽지 않게)
+        events.put(("error", str(e) or type(e).__name__))
+    finally:
+        if seq is not None:
+            seq.end_recording()
+        if ring is not None:
+            ring.close()
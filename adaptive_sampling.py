@@ -0,0 +1,55 @@
+import numpy as np
+
+
+# ============================================================
+# 적응형 각도 샘플링: 이웃 프레임 사이 중 필요한 곳만 추가 측정
+# ============================================================
+def interval_scores(angles, depths, span_deg, rel_thresh=0.15):
+    # angles: (F,) 측정 각도 (deg), depths: (F, N, N) cm (무효 NaN)
+    # 각 구간 [a_i, a_(i+1)] 의 중간 방향을 두 프레임이 어떻게 보는지 비교
+    # 반환: (구간 중간 각도, 구간 폭, 점수) — 점수 = 미관측 행 비율 + 깊이 불연속 행 비율
+    order = np.argsort(angles)
+    a = np.asarray(angles, dtype=float)[order] % 360.0
+    d = np.asarray(depths, dtype=float)[order]
+    n = d.shape[-1]
+
+    gap = (np.roll(a, -1) - a) % 360.0
+    if len(a) == 1:
+        gap[:] = 360.0
+    mid = a + gap / 2.0
+
+    # 중간 방향이 각 프레임에서 몇 번째 열인지 (FOV 밖이면 미관측)
+    pitch = span_deg / (n - 1)
+    col_l = np.rint((gap / 2.0 + span_deg / 2.0) / pitch).astype(int)
+    col_r = np.rint((-gap / 2.0 + span_deg / 2.0) / pitch).astype(int)
+    inside = (col_l <= n - 1) & (col_r >= 0)
+
+    rows = np.arange(len(a))
+    left = d[rows, :, np.clip(col_l, 0, n - 1)]                    # (F, N)
+    right = np.roll(d, -1, axis=0)[rows, :, np.clip(col_r, 0, n - 1)]
+
+    one_missing = np.isnan(left) != np.isnan(right)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rel = np.abs(left - right) / np.fmin(left, right)
+    jump = rel > rel_thresh
+
+    score = (one_missing.sum(axis=1) + jump.sum(axis=1)) / n
+    score[~inside] = 1.0 + score[~inside]
+    return mid % 360.0, gap, score
+
+
+def plan_refinement(angles, depths, span_deg, rel_thresh=0.15,
+                    min_score=0.25, min_step=1.0, max_extra=None):
+    # 점수 높은 구간의 중간 각도를 추가 측정 대상으로 (구간이 너무 좁으면 제외)
+    mid, gap, score = interval_scores(angles, depths, span_deg, rel_thresh)
+    want = (score >= min_score) & (gap / 2.0 >= min_step)
+    idx = np.flatnonzero(want)
+    idx = idx[np.argsort(-score[idx], kind='stable')]
+    if max_extra is not None:
+        idx = idx[:max_extra]
+    return mid[idx].tolist()
+
+
+def order_for_travel(targets, current):
+    # 한 방향으로만 도는 모터: 현재 위치에서 앞으로 가며 만나는 순서가 최소 이동
+    return sorted(targets, key=lambda t: (t - current) % 360.0)
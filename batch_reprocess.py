@@ -0,0 +1,192 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from projection import project_frames, rotate_z, grid_normals, sensor_tables, ELEVS_8X8
+from registration import ScanRegistration
+from mesh_decimation import (
+    AngularCoverage, cell_mask, merge_coplanar, merge_coplanar_frames, cluster_vertices,
+    write_obj
+)
+from session_io import read_meta, open_frames, depths_cm, list_sessions, FRAMES_FILE
+from depth_filter import filter_depth
+
+
+PIPELINE_VERSION = 3     # 처리 단계가 바뀌면 올려서 전부 다시 처리
+RESULT_FILE = "result.json"
+MESH_FILE = "mesh.obj"
+CHUNK = 256              # 한 번에 memmap 에서 읽어 투영하는 프레임 수
+
+DEFAULTS = {
+    "fov_deg": 60.0,
+    "mm_per_cm": 10.0,
+    "min_range_cm": 0.0,     # 이 범위 밖 거리는 무효로 처리
+    "max_range_cm": 400.0,
+    "filter": True,          # 튀는 픽셀 / 깊이 경계 칸 제거
+    "rel_outlier": 0.1,
+    "rel_edge": 0.25,
+    "register": True,
+    "reg_max_yaw": 3.0,
+    "mesh_tol": 1.0,
+    "cover_frac": 0.9,
+    "cluster": 2.0,
+}
+
+
+def params_hash(params):
+    # 투영 테이블까지 포함해서 결과에 영향을 주는 값 전부
+    key = dict(params, elevs_8x8=ELEVS_8X8, version=PIPELINE_VERSION)
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def input_stamp(path):
+    # 기록 중인 세션은 frames.bin 이 계속 자라므로 크기/수정 시각이 같을 때만 같은 입력
+    st = os.stat(os.path.join(path, FRAMES_FILE))
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ============================================================
+# 세션 하나 처리 (워커 프로세스 하나가 세션 하나)
+# ============================================================
+def process_session(path, params, out_root=None, force=False):
+    t0 = time.perf_counter()
+    name = os.path.basename(os.path.normpath(path))
+    out_dir = os.path.join(out_root, name) if out_root else os.path.join(path, "processed")
+    result_path = os.path.join(out_dir, RESULT_FILE)
+    digest = params_hash(params)
+    stamp = input_stamp(path)
+
+    if not force and os.path.isfile(result_path):
+        with open(result_path) as f:
+            prev = json.load(f)
+        if prev.get("params_hash") == digest and prev.get("input") == stamp:
+            return {"session": name, "skipped": True}
+
+    meta = read_meta(path)
+    n = meta["grid_size"]
+    elevs, span = sensor_tables(n, params["fov_deg"])
+    frames = open_frames(path)
+
+    reg = ScanRegistration(max_yaw=params["reg_max_yaw"]) if params["register"] else None
+    coverage = AngularCoverage(n - 1, min_frac=params["cover_frac"], tol=params["mesh_tol"])
+    yaw_offset = 0.0
+    quads = []
+    n_points = 0
+
+    # memmap 에서 CHUNK 개씩만 읽는다 (세션 전체를 메모리에 올리지 않음)
+    for start in range(0, len(frames), CHUNK):
+        chunk = frames[start:start + CHUNK]
+        depth = depths_cm(chunk, n, params["mm_per_cm"])
+        depth[(depth < params["min_range_cm"]) | (depth > params["max_range_cm"])] = np.nan
+        depth = depth.reshape(-1, n, n)
+        face_ok = np.ones((len(chunk), n - 1, n - 1), dtype=bool)
+        if params["filter"]:
+            depth, face_ok = filter_depth(depth, elevs, params["rel_outlier"], params["rel_edge"])
+        grids = project_frames(depth, chunk["angle"], elevs, span)
+
+        for angle, grid_pts, ok in zip(chunk["angle"], grids, face_ok):
+            valid = ~np.isnan(grid_pts[..., 0])
+            if not valid.any():
+                continue
+            # GUI 와 같은 순서: 지난 프레임까지의 오차로 시작해서 정합
+            grid_pts = rotate_z(grid_pts, yaw_offset)
+            if reg is not None:
+                yaw = reg.align(grid_pts[valid])
+                if yaw:
+                    yaw_offset += yaw
+                    grid_pts = rotate_z(grid_pts, yaw)
+                reg.insert(grid_pts[valid], grid_normals(grid_pts)[valid])
+
+            cells = coverage.cull(cell_mask(grid_pts) & ok, float(angle) + yaw_offset, span,
+                                  grid_pts)
+            quads.extend(merge_coplanar(grid_pts, params["mesh_tol"], cells))
+            n_points += int(valid.sum())
+
+    if quads:
+        quads = merge_coplanar_frames(quads, params["mesh_tol"])
+        quads = cluster_vertices(quads, params["cluster"])
+    os.makedirs(out_dir, exist_ok=True)
+    write_obj(os.path.join(out_dir, MESH_FILE), quads)
+
+    result = {
+        "session": name,
+        "params_hash": digest,
+        "params": params,
+        "input": stamp,
+        "frames": len(frames),
+        "points": n_points,
+        "faces": len(quads),
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+    # 결과 파일은 마지막에 원자적으로 써서 중간에 끊긴 세션은 다음에 다시 처리
+    tmp = result_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f, indent=1)
+    os.replace(tmp, result_path)
+    return result
+
+
+# ============================================================
+# 명령줄: python batch_reprocess.py sessions/ [-j 4] [--fov 60] ...
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocess recorded scan sessions in parallel")
+    parser.add_argument("root", help="directory containing recorded sessions")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("-o", "--out", help="write results here instead of <session>/processed")
+    parser.add_argument("--force", action="store_true", help="reprocess even if the parameters and input match")
+    parser.add_argument("--fov", type=float, default=DEFAULTS["fov_deg"], help="deg")
+    parser.add_argument("--mm-per-cm", type=float, default=DEFAULTS["mm_per_cm"])
+    parser.add_argument("--min-range", type=float, default=DEFAULTS["min_range_cm"], help="cm")
+    parser.add_argument("--max-range", type=float, default=DEFAULTS["max_range_cm"], help="cm")
+    parser.add_argument("--no-filter", action="store_true", help="skip the depth outlier/edge filter")
+    parser.add_argument("--rel-outlier", type=float, default=DEFAULTS["rel_outlier"])
+    parser.add_argument("--rel-edge", type=float, default=DEFAULTS["rel_edge"])
+    parser.add_argument("--no-register", action="store_true", help="use commanded angles as-is")
+    parser.add_argument("--mesh-tol", type=float, default=DEFAULTS["mesh_tol"], help="cm")
+    parser.add_argument("--cover-frac", type=float, default=DEFAULTS["cover_frac"])
+    parser.add_argument("--cluster", type=float, default=DEFAULTS["cluster"], help="cm")
+    args = parser.parse_args(argv)
+
+    params = dict(DEFAULTS,
+                  fov_deg=args.fov, mm_per_cm=args.mm_per_cm,
+                  min_range_cm=args.min_range, max_range_cm=args.max_range,
+                  filter=not args.no_filter, rel_outlier=args.rel_outlier,
+                  rel_edge=args.rel_edge,
+                  register=not args.no_register, mesh_tol=args.mesh_tol,
+                  cover_frac=args.cover_frac, cluster=args.cluster)
+    sessions = list_sessions(args.root)
+    print(f"{len(sessions)} sessions, params {params_hash(params)}")
+
+    t0 = time.perf_counter()
+    done = skipped = failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(process_session, s, params, args.out, args.force): s
+                   for s in sessions}
+        for fut in as_completed(futures):
+            name = os.path.basename(futures[fut])
+            try:
+                res = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"FAIL {name}: {e}")
+                continue
+            if res.get("skipped"):
+                skipped += 1
+                continue
+            done += 1
+            print(f"done {name}: {res['frames']} frames → {res['faces']} faces "
+                  f"({res['elapsed_s']:.1f} s)")
+
+    print(f"{done} processed, {skipped} up to date, {failed} failed "
+          f"in {time.perf_counter() - t0:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
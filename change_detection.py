@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from projection import project_frames, sensor_tables
+from session_io import read_meta, open_frames, depths_cm
+
+
+# ============================================================
+# 세션 → 각도별 최신 프레임
+# ============================================================
+def latest_frames(frames):
+    # 같은 명령 각도(0.001° 단위)는 마지막 프레임만 남긴다 (연속 모드 → 최근 회전)
+    # 반환 레코드는 각도 오름차순
+    key = np.rint(np.mod(frames["angle"], 360.0) * 1000).astype(np.int64)
+    _, last = np.unique(key[::-1], return_index=True)
+    return frames[len(key) - 1 - last]
+
+
+def match_angles(ang_a, ang_b, tol=0.05):
+    # 정렬된 두 각도 배열에서 원형 차이 ≤ tol 인 쌍 → (a 인덱스, b 인덱스)
+    if len(ang_a) == 0 or len(ang_b) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pos = np.searchsorted(ang_a, ang_b)
+    cand = np.stack([pos - 1, pos % len(ang_a)])      # 양옆 후보 (-1 은 마지막으로 감김)
+    diff = np.abs(ang_a[cand] - ang_b)
+    diff = np.minimum(diff, 360.0 - diff)
+    pick = np.argmin(diff, axis=0)
+    cols = np.arange(len(ang_b))
+    ok = diff[pick, cols] <= tol
+    return cand[pick, cols][ok], cols[ok]
+
+
+# ============================================================
+# 같은 각도: 픽셀 단위 깊이 차이 (한 번에)
+# ============================================================
+def pixel_changes(depth_ref, depth_cur, abs_thresh=3.0, rel_thresh=0.05):
+    # depth_*: (M, N*N) cm, NaN = 무효
+    delta = depth_cur - depth_ref
+    ref_ok = ~np.isnan(depth_ref)
+    cur_ok = ~np.isnan(depth_cur)
+    thresh = np.maximum(abs_thresh, rel_thresh * np.where(ref_ok, depth_ref, 0.0))
+    with np.errstate(invalid='ignore'):
+        changed = ref_ok & cur_ok & (np.abs(delta) > thresh)
+    return {
+        "delta": delta,
+        "compared": ref_ok & cur_ok,
+        "changed": changed,
+        "appeared": ~ref_ok & cur_ok,
+        "vanished": ref_ok & ~cur_ok,
+    }
+
+
+# ============================================================
+# 다른 각도: 기준 세션 깊이를 현재 광선 방향으로 보간해서 비교
+# ============================================================
+def ray_table(depth, angles, elevs, span_deg):
+    # 센서는 원점에서 yaw 만 하므로 세션 전체를 (행 고도각, 방위각) 깊이 표 하나로 펼친다
+    # depth: (K, N*N) cm → (방위각 오름차순 (M,), 깊이 (N, M), 행 고도각 (N,), 열 간격 deg)
+    n = len(elevs)
+    pitch = span_deg / (n - 1)
+    az = np.mod(np.asarray(angles, dtype=float)[:, None] - span_deg / 2.0
+                + np.arange(n) * pitch, 360.0).ravel()
+    order = np.argsort(az, kind="stable")
+    d = np.asarray(depth, dtype=float).reshape(-1, n, n).transpose(1, 0, 2).reshape(n, -1)
+    return az[order], d[:, order], np.asarray(elevs, dtype=float), pitch
+
+
+def _line(x0, x1, y0, y1, ok=True):
+    # (x0, y0), (x1, y1) 을 지나는 직선의 x = 0 값 (보간/외삽), 쓸 수 없으면 NaN
+    h = x1 - x0
+    good = ok & (h != 0)
+    return np.where(good, y0 - (y1 - y0) * x0 / np.where(good, h, 1.0), np.nan)
+
+
+def ray_changes(table, depth, angles, elevs, span_deg, abs_thresh=3.0, rel_thresh=0.05):
+    # depth 의 픽셀마다 table 에서 둘러싼 광선들로 기준 깊이를 추정해서 비교
+    # 평면에서는 1/깊이 가 광선 방향에 (거의) 선형 → 역깊이로 이웃 두 광선을 잇는 직선을
+    # 방위각 (양옆 사이 보간, 한쪽 두 광선 외삽) × 고도각 (위/아래 행, 보간, 외삽) 으로 만들고
+    # 그중 하나라도 임계값 안이면 그대로로 본다 (모서리 / 깊이 경계에 걸친 광선 포함)
+    # 반환 (K, N*N) 마스크: compared / changed / appeared (둘러싼 기준 광선이 전부 무효)
+    t_az, t_d, t_el, t_pitch = table
+    k, n = len(depth), len(elevs)
+    out = {key: np.zeros((k, n * n), dtype=bool) for key in ("compared", "changed", "appeared")}
+    if k == 0 or len(t_az) == 0:
+        return out
+    d = np.asarray(depth, dtype=float).reshape(k, n, n)
+
+    az = np.mod(np.asarray(angles, dtype=float)[:, None] - span_deg / 2.0
+                + np.arange(n) * span_deg / (n - 1), 360.0)
+    az = np.broadcast_to(az[:, None, :], d.shape)
+    el = np.broadcast_to(np.asarray(elevs, dtype=float)[None, :, None], d.shape)
+
+    # 방위각: 양옆 lo/hi 와 그 바깥 광선 (360° 에서 감김), 질의 방향 기준 상대 각도
+    m = len(t_az)
+    hi = np.searchsorted(t_az, az) % m
+    cols = [(hi - 2) % m, (hi - 1) % m, hi, (hi + 1) % m]
+    rel = [np.mod(t_az[c] - az + 180.0, 360.0) - 180.0 for c in cols]
+    # 기준 열 간격보다 벌어진 곳은 기준이 못 본 구간, 외삽은 너무 가까운 두 광선으로는 안 함
+    in_az = rel[2] - rel[1] <= t_pitch * 1.001
+    ext_l = (rel[1] - rel[0] <= t_pitch * 1.001) & (rel[1] - rel[0] >= t_pitch / 4)
+    ext_r = (rel[3] - rel[2] <= t_pitch * 1.001) & (rel[3] - rel[2] >= t_pitch / 4)
+
+    # 고도각: 위/아래 행 up/dn (t_el 내림차순, 같은 해상도면 같은 행) 과 그 바깥 행
+    last = len(t_el) - 1
+    dn = np.searchsorted(-t_el, -el)
+    in_el = (dn <= last) & ((dn > 0) | (t_el[np.minimum(dn, last)] == el))
+    dn = np.minimum(dn, last)
+    up = np.where(t_el[dn] == el, dn, np.maximum(dn - 1, 0))
+    rows = [np.maximum(up - 1, 0), up, dn, np.minimum(dn + 1, last)]
+    # 평면이면 1 / (깊이 × cos 고도각) 이 tan 고도각에 정확히 선형
+    rel_el = [np.tan(np.radians(t_el[r])) - np.tan(np.radians(el)) for r in rows]
+    cos_el = [np.cos(np.radians(t_el[r])) for r in rows]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inv = [[1.0 / t_d[r, c] for c in cols] for r in rows]
+        # 행마다 방위각 방향 추정 3개 (보간, 왼쪽 외삽, 오른쪽 외삽)
+        per_row = [np.stack([_line(rel[1], rel[2], v[1], v[2]),
+                             _line(rel[0], rel[1], v[0], v[1], ext_l),
+                             _line(rel[2], rel[3], v[2], v[3], ext_r)]) for v in inv]
+        # 고도각 방향: 위/아래 행 그대로, 두 행 사이 보간, 위쪽·아래쪽 두 행 외삽
+        horiz = [v / c for v, c in zip(per_row, cos_el)]
+        vert = np.concatenate([
+            _line(rel_el[1], rel_el[2], horiz[1], horiz[2], up != dn),
+            _line(rel_el[0], rel_el[1], horiz[0], horiz[1], rows[0] != rows[1]),
+            _line(rel_el[2], rel_el[3], horiz[2], horiz[3], rows[2] != rows[3]),
+        ]) * np.cos(np.radians(el))
+        cand = 1.0 / np.concatenate([per_row[1], per_row[2], vert])
+        cand[cand <= 0] = np.nan
+        near = (np.abs(d - cand) <= np.maximum(abs_thresh, rel_thresh * cand)).any(axis=0)
+
+    corners = np.stack([t_d[up, cols[1]], t_d[up, cols[2]], t_d[dn, cols[1]], t_d[dn, cols[2]]])
+    inside = ~np.isnan(d) & in_az & in_el
+    any_ref = ~np.isnan(corners).all(axis=0)
+    out["compared"] = (inside & any_ref).reshape(k, -1)
+    out["changed"] = (inside & any_ref & ~near).reshape(k, -1)
+    out["appeared"] = (inside & ~any_ref).reshape(k, -1)
+    return out
+
+
+# ============================================================
+# 두 세션 비교 → (요약 보고서, 바뀐 점, 사라진 점)
+# ============================================================
+def diff_sessions(ref_path, cur_path, fov_deg=None, angle_tol=0.05,
+                  abs_thresh=3.0, rel_thresh=0.05):
+    t0 = time.perf_counter()
+    meta_ref, meta_cur = read_meta(ref_path), read_meta(cur_path)
+    fr_ref = latest_frames(open_frames(ref_path))
+    fr_cur = latest_frames(open_frames(cur_path))
+
+    def load(meta, frames):
+        elevs, span = sensor_tables(meta["grid_size"], fov_deg or meta["fov_deg"])
+        depth = depths_cm(frames, meta["grid_size"])
+        pts = project_frames(depth, frames["angle"], elevs, span)
+        table = ray_table(depth, frames["angle"], elevs, span)
+        return depth, pts.reshape(len(frames), meta["grid_size"] ** 2, 3), elevs, span, table
+
+    d_ref, p_ref, el_ref, span_ref, t_ref = load(meta_ref, fr_ref)
+    d_cur, p_cur, el_cur, span_cur, t_cur = load(meta_cur, fr_cur)
+
+    # 해상도가 같을 때만 픽셀 비교, 나머지 프레임은 상대 세션 광선 보간과 비교
+    same_res = meta_ref["grid_size"] == meta_cur["grid_size"]
+    if same_res:
+        ia, ib = match_angles(fr_ref["angle"] % 360.0, fr_cur["angle"] % 360.0, angle_tol)
+        px = pixel_changes(d_ref[ia], d_cur[ib], abs_thresh, rel_thresh)
+    else:
+        ia = ib = np.empty(0, dtype=np.int64)
+        px = pixel_changes(d_ref[:0], d_ref[:0], abs_thresh, rel_thresh)    # 비교할 픽셀 없음
+
+    only_ref = np.ones(len(fr_ref), dtype=bool)
+    only_ref[ia] = False
+    only_cur = np.ones(len(fr_cur), dtype=bool)
+    only_cur[ib] = False
+    # 짝 없는 프레임은 상대 세션 전체 (짝 있는 프레임 포함) 광선과 비교
+    rc_cur = ray_changes(t_ref, d_cur[only_cur], fr_cur["angle"][only_cur], el_cur, span_cur,
+                         abs_thresh, rel_thresh)
+    rc_ref = ray_changes(t_cur, d_ref[only_ref], fr_ref["angle"][only_ref], el_ref, span_ref,
+                         abs_thresh, rel_thresh)
+    added = rc_cur["changed"] | rc_cur["appeared"]
+    removed = rc_ref["changed"] | rc_ref["appeared"]
+
+    # 강조 표시할 점: 바뀌었거나 새로 생긴 곳 (현재), 사라진 곳 (기준)
+    new_mask = px["changed"] | px["appeared"]
+    none = np.empty((0, 3))
+    changed_pts = np.concatenate([p_cur[ib][new_mask] if same_res else none,
+                                  p_cur[only_cur][added]])
+    removed_pts = np.concatenate([p_ref[ia][px["vanished"]], p_ref[only_ref][removed]])
+
+    # 바뀐 스텝만 짧게
+    per_step = new_mask.sum(axis=1) + px["vanished"].sum(axis=1)
+    abs_delta = np.where(px["changed"], np.abs(px["delta"]), 0.0)
+    steps = [
+        {"angle": round(float(fr_cur["angle"][ib[k]]), 3),
+         "changed": int(px["changed"][k].sum()),
+         "appeared": int(px["appeared"][k].sum()),
+         "vanished": int(px["vanished"][k].sum()),
+         "max_delta_cm": round(float(abs_delta[k].max()), 1)}
+        for k in np.nonzero(per_step)[0]
+    ]
+    compared = int(px["compared"].sum())
+    report = {
+        "reference": os.path.basename(os.path.normpath(ref_path)),
+        "current": os.path.basename(os.path.normpath(cur_path)),
+        "frames": {"reference": len(fr_ref), "current": len(fr_cur), "matched": len(ia)},
+        "pixels": {
+            "compared": compared,
+            "changed": int(px["changed"].sum()),
+            "appeared": int(px["appeared"].sum()),
+            "vanished": int(px["vanished"].sum()),
+            "mean_abs_delta_cm": round(float(np.abs(px["delta"][px["compared"]]).mean()), 2)
+            if compared else 0.0,
+        },
+        "rays": {
+            "compared": int(rc_cur["compared"].sum() + rc_ref["compared"].sum()),
+            "added": int(added.sum()),
+            "removed": int(removed.sum()),
+        },
+        "steps": steps,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1e3, 2),
+    }
+    return report, changed_pts, removed_pts
+
+
+# ============================================================
+# 명령줄: python change_detection.py <기준 세션> <현재 세션> [-o diff.json]
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two recorded scan sessions")
+    parser.add_argument("reference")
+    parser.add_argument("current")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--fov", type=float, default=None, help="override the recorded FOV (deg)")
+    parser.add_argument("--abs-thresh", type=float, default=3.0, help="cm")
+    parser.add_argument("--rel-thresh", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    report = diff_sessions(args.reference, args.current, fov_deg=args.fov,
+                           abs_thresh=args.abs_thresh, rel_thresh=args.rel_thresh)[0]
+    text = json.dumps(report, separators=(",", ":"))
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
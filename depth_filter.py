@@ -0,0 +1,86 @@
+import numpy as np
+
+
+# 3×3 이웃 (중심 제외)
+_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)]
+
+
+def _neighbors(depth):
+    # (..., N, N) → (..., N, N, 8), 격자 밖은 NaN
+    n = depth.shape[-1]
+    pad = [(0, 0)] * (depth.ndim - 2) + [(1, 1), (1, 1)]
+    p = np.pad(depth, pad, constant_values=np.nan)
+    return np.stack([p[..., 1 + dr:1 + dr + n, 1 + dc:1 + dc + n] for dr, dc in _OFFSETS],
+                    axis=-1)
+
+
+# ============================================================
+# 날아다니는 픽셀 / 튀는 값: 이웃 중 비슷한 깊이가 하나도 없으면 버림
+# ============================================================
+def outlier_mask(depth, rel=0.1, min_support=1):
+    # depth: (..., N, N) cm, NaN = 무효 → 남길 픽셀 마스크
+    # 경계의 혼합 픽셀은 앞/뒤 어느 쪽과도 안 맞아서 여기서 걸린다
+    d = depth[..., None]
+    with np.errstate(invalid='ignore'):
+        close = np.abs(_neighbors(depth) - d) <= rel * d
+    return ~np.isnan(depth) & (close.sum(axis=-1) >= min_support)
+
+
+# ============================================================
+# 깊이 불연속: 가려진 경계에 걸친 칸은 면을 만들지 않음
+# ============================================================
+def _jumps(w, t, rel):
+    # w: (..., M) 마지막 축을 따라 평면이면 t 에 선형인 역깊이, t: (M,) 좌표
+    # 반환 (..., M-1): 이웃 두 픽셀 a|b 사이가 가림 경계인지
+    # 각 쪽에서 두 픽셀로 이은 직선을 건너편으로 외삽해서
+    #   먼 쪽은 가까운 쪽 면의 연장보다 (1 + rel) 배 이상 멀고
+    #   가까운 쪽은 먼 쪽 면의 연장보다 (1 + rel) 배 이상 가까우면 경계
+    # 오목한 모서리 (벽/바닥) 는 양쪽 다 연장보다 가깝고, 볼록한 모서리는 양쪽 다 멀어서 경계가 아니다
+    # 바깥 픽셀이 없거나 무효면 그 쪽은 상수로 외삽 (단순 깊이 비 비교)
+    t = np.asarray(t, dtype=float)
+    pad = [(0, 0)] * (w.ndim - 1) + [(1, 1)]
+    wp = np.pad(w, pad, constant_values=np.nan)
+    tp = np.pad(t, 1, mode='reflect', reflect_type='odd')
+    a, b = wp[..., 1:-2], wp[..., 2:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pred_b = a + (a - wp[..., :-3]) * (tp[2:-1] - tp[1:-2]) / (tp[1:-2] - tp[:-3])
+        pred_a = b + (wp[..., 3:] - b) * (tp[1:-2] - tp[2:-1]) / (tp[3:] - tp[2:-1])
+        pred_b = np.where(np.isnan(pred_b), a, pred_b)
+        pred_a = np.where(np.isnan(pred_a), b, pred_a)
+        a_near = (b * (1.0 + rel) < pred_b) & (a > (1.0 + rel) * pred_a)
+        b_near = (a * (1.0 + rel) < pred_a) & (b > (1.0 + rel) * pred_b)
+    return a_near | b_near
+
+
+def _step(w, axis, rel):
+    # 축을 따라 이웃 두 픽셀 깊이 비가 (1 + rel) 를 넘는지
+    a = np.delete(w, -1, axis=axis)
+    b = np.delete(w, 0, axis=axis)
+    return np.maximum(a, b) > (1.0 + rel) * np.minimum(a, b)
+
+
+def edge_cells(depth, elevs, rel=0.25):
+    # (..., N-1, N-1): 네 꼭짓점이 유효하고 네 변 어디에도 깊이 경계가 없는 칸
+    # 평면에서 1/깊이 는 방위각 (열) 에 거의 선형, 1 / (깊이 × cos 고도각) 은 tan 고도각 (행) 에 정확히 선형
+    # → 비스듬한 바닥 띠처럼 꼭짓점 깊이 차가 커도 한 면이면 남는다
+    # 세 면이 만나는 방 구석처럼 외삽이 안 맞는 곳도 있어서, 두 픽셀 깊이 자체도 (1 + rel) 배 넘게 달라야 경계
+    depth = np.asarray(depth, dtype=float)
+    n = depth.shape[-1]
+    el = np.radians(np.asarray(elevs, dtype=float))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = np.where(depth > 0, 1.0 / depth, np.nan)
+        across = _jumps(w, np.arange(n), rel)                               # (..., N, N-1)
+        down = np.swapaxes(_jumps(np.swapaxes(w / np.cos(el)[:, None], -1, -2), np.tan(el), rel),
+                           -1, -2)                                         # (..., N-1, N)
+        across &= _step(w, -1, rel)
+        down &= _step(w, -2, rel)
+    valid = ~np.isnan(w)
+    return (valid[..., :-1, :-1] & valid[..., :-1, 1:] & valid[..., 1:, :-1] & valid[..., 1:, 1:]
+            & ~across[..., :-1, :] & ~across[..., 1:, :] & ~down[..., :, :-1] & ~down[..., :, 1:])
+
+
+def filter_depth(depth, elevs, rel_outlier=0.1, rel_edge=0.25, min_support=1):
+    # 반환: (이상치를 NaN 으로 바꾼 깊이, 면을 만들어도 되는 칸 마스크)
+    depth = np.array(depth, dtype=float)
+    depth[~outlier_mask(depth, rel_outlier, min_support)] = np.nan
+    return depth, edge_cells(depth, elevs, rel_edge)
@@ -0,0 +1,83 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+MAX_CELLS = 64   # 8×8 (4×4 는 앞 16칸만 사용)
+
+# 슬롯 하나 = 프레임 하나. seq 는 기록이 끝난 뒤에 마지막으로 쓴다
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),          # 0 = 비어 있음/기록 중
+    ("t", "<f8"),            # 수신 시각 (time.time)
+    ("angle", "<f8"),        # 명령 각도 (deg)
+    ("index", "<u4"),        # 스캔 안에서 몇 번째 프레임인지
+    ("grid_size", "<u2"),
+    ("grid", "<u2", (MAX_CELLS,)),   # 거리 (mm), 0 = 무효
+])
+_HEAD = 8
+
+
+# ============================================================
+# 프로세스 간 프레임 링 (multiprocessing.shared_memory)
+# ============================================================
+class FrameRing:
+    def __init__(self, slots=256, name=None):
+        # name 이 없으면 새로 만들고, 있으면 기존 링에 붙는다
+        if name is None:
+            size = _HEAD + slots * SLOT_DTYPE.itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            slots = (self.shm.size - _HEAD) // SLOT_DTYPE.itemsize
+            self.owner = False
+        self.name = self.shm.name
+        self.head = np.ndarray((1,), dtype="<u8", buffer=self.shm.buf)   # 마지막으로 쓴 seq
+        self.slots = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=self.shm.buf, offset=_HEAD)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def latest(self):
+        return int(self.head[0])
+
+    # --------------------------------------------------------
+    # 쓰기 (수집 프로세스 하나만)
+    # --------------------------------------------------------
+    def write(self, angle, index, grid_size, grid_mm, t=None):
+        seq = int(self.head[0]) + 1
+        i = seq % len(self.slots)
+        slot = self.slots[i:i + 1]
+        slot["seq"] = 0
+        slot["t"] = time.time() if t is None else t
+        slot["angle"] = angle
+        slot["index"] = index
+        slot["grid_size"] = grid_size
+        n = grid_size * grid_size
+        slot["grid"][0, :n] = grid_mm
+        slot["grid"][0, n:] = 0
+        slot["seq"] = seq
+        self.head[0] = seq
+        return seq
+
+    # --------------------------------------------------------
+    # 읽기: 복사 없이 슬롯 뷰를 돌려준다
+    # --------------------------------------------------------
+    def read(self, seq):
+        # 아직 안 썼거나 이미 덮어쓴 seq 면 None
+        slot = self.slots[seq % len(self.slots)]
+        if int(slot["seq"]) != seq:
+            return None
+        return slot
+
+    def valid(self, seq):
+        # 뷰를 다 쓴 뒤 호출: 그 사이 덮어써졌으면 False
+        return int(self.slots["seq"][seq % len(self.slots)]) == seq
+
+    def close(self):
+        self.head = self.slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -1,18 +1,88 @@
+import os
 import sys
 import math
-import serial
+import time
+import json
+import queue
+import multiprocessing as mp
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QGridLayout
+    QLineEdit, QPushButton, QGridLayout, QComboBox, QCheckBox, QFileDialog
 )
 from PyQt5.QtCore import QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
+from projection import (
+    project_grid, rotate_z, grid_normals, grid_quads, sensor_tables, RESOLUTIONS
+)
+from registration import ScanRegistration
+from occupancy import OccupancyMap
+from revolution_ring import RevolutionRing
+from mesh_decimation import (
+    AngularCoverage, cell_mask, merge_coplanar, merge_coplanar_frames, cluster_vertices,
+    write_obj
+)
+from metrics import METRICS, start_http_server
+from frame_ring import FrameRing
+from acquisition import run_acquisition
+from change_detection import diff_sessions
+from depth_filter import filter_depth
 
-GRID_SIZE = 8
+
+GRID_SIZE = 8       # 기본 해상도 (세션마다 4 또는 8 로 바꿀 수 있음)
 FOV_DEG = 60.0
+RING_SLOTS = 256    # 수집 → GUI 공유 메모리 프레임 링 크기
+
+# 스캔 간 정합 (모터 스텝 오차 보정)
+REG_ENABLED = True
+REG_MAX_YAW = 3.0   # 명령 각도 주변 yaw 탐색 범위 (deg)
+
+OCC_VOXEL = 5.0     # 점유 격자 셀 크기 (cm)
+
+# 적응형 샘플링: 거친 1회전 후 깊이 불연속/미관측 구간만 추가 측정
+ADAPT_ROUNDS = 2         # 추가 측정 반복 횟수
+ADAPT_REL_THRESH = 0.15  # 같은 방향 깊이 차이가 이 비율을 넘으면 불연속
+ADAPT_MIN_STEP = 1.0     # 이보다 좁은 구간은 더 나누지 않음 (deg)
+
+# 연속 매핑: 최근 RING_REVOLUTIONS 회전만 유지
+RING_REVOLUTIONS = 3
+BG_ALPHA = 0.05          # 배경 모델 감쇠율 (None 이면 배경 모델 없음)
+
+# 깊이 필터: 투영 전에 튀는 픽셀과 깊이 경계에 걸친 칸 제거
+DEPTH_FILTER = True
+FILTER_REL_OUTLIER = 0.1  # 이웃 중 하나라도 이 비율 안의 깊이면 정상 픽셀
+FILTER_REL_EDGE = 0.25    # 이웃 픽셀이 서로의 면 연장보다 (1 + 이 값) 배 넘게 어긋나면 (가림 경계) 면을 만들지 않음
+                          # (바닥처럼 비스듬한 면도 먼 행끼리는 비율이 커지므로 너무 낮추지 말 것)
+
+# 면 간소화
+MESH_DECIMATE = True
+MESH_TOL = 1.0           # 병합된 면이 원래 꼭짓점에서 벗어날 수 있는 거리 (cm)
+MESH_COVER_FRAC = 0.9    # 이 비율 이상 덮인 방위각에서 깊이도 MESH_TOL 이내인 칸은 면을 만들지 않음
+MESH_CLUSTER = 2.0       # 스캔 후 꼭짓점 군집 크기 (cm)
+
+# 세션 기록 / 비교
+SESSION_DIR = "sessions"  # 스캔마다 sessions/scan_<시각>/ 에 원본 프레임 기록 (None 이면 끔)
+
+# 모니터링
+VERBOSE = False          # True 면 수신/송신 줄마다 터미널 출력
+METRICS_PORT = 9108      # http://127.0.0.1:9108/metrics (None 이면 끔)
+SHOW_STATUS = True       # MainController 상태 표시줄
+
+PROJECT_TIME = METRICS.histogram(
+    "frame_project_seconds", "Projection, registration, occupancy and meshing time per frame")
+DRAW_TIME = METRICS.histogram("frame_draw_seconds", "3D canvas redraw time")
+SCAN_FRAMES = METRICS.counter("scan_frames_total", "Frames handled by the controller")
+SCAN_PROGRESS = METRICS.gauge("scan_progress_ratio", "Frames done / frames planned in this scan")
+FILTERED_PIXELS = METRICS.counter("depth_filter_pixels_total", "Pixels rejected as outliers")
+FILTERED_CELLS = METRICS.counter("depth_filter_cells_total", "Cells dropped at depth discontinuities")
+
+
+def log(msg):
+    if VERBOSE:
+        print(msg)
 
 # ============================================================
 # 3D 그래프 창
@@ -31,11 +101,34 @@ class GraphWindow(QWidget):
         self.setLayout(layout)
 
         self.az_center = 0.0
-        self.elevs = [30, 15, 0, -15, -30, -45, -60, -75]
+        self.set_grid_size(GRID_SIZE)
         self.all_points = []  # 누적 포인트
         self.all_quads  = []   # ★ 누적 면(사각형)들
+        self.ring = None       # ★ 연속 모드일 때만 사용 (최근 K 회전)
+        self.coverage_rev = 0
+        self.registration = ScanRegistration(max_yaw=REG_MAX_YAW) if REG_ENABLED else None
+        self.occupancy = OccupancyMap(voxel=OCC_VOXEL)  # ★ 장애물/빈칸 질의용 점유 격자
+        self.changes = None    # ★ 세션 비교 결과 (바뀐 점, 사라진 점)
         self.reset_axis()
 
+    def set_grid_size(self, n):
+        self.grid_size = n
+        self.elevs, self.fov = sensor_tables(n, FOV_DEG)
+        self.coverage = AngularCoverage(n - 1, min_frac=MESH_COVER_FRAC, tol=MESH_TOL)
+
+    # 연속 모드 시작/종료
+    def start_continuous(self, revolutions, steps):
+        self.ring = RevolutionRing(revolutions, steps, self.grid_size, bg_alpha=BG_ALPHA)
+
+    def stop_continuous(self):
+        self.ring = None
+
+    # 새 세션: 정합 기준 클라우드와 점유 격자는 이전 세션 것을 쓰지 않는다
+    def reset_maps(self):
+        if self.registration is not None:
+            self.registration.reset()
+        self.occupancy = OccupancyMap(voxel=OCC_VOXEL)
+
     def reset_axis(self):
         self.ax.cla()
         self.ax.set_xlim(-20, 20)
@@ -50,70 +143,130 @@ class GraphWindow(QWidget):
         except:
             pass
 
-    def update_plot(self, dist_list_cm):
-        if len(dist_list_cm) != GRID_SIZE**2:
+    # slot = (회전 번호, 스텝 번호): 연속 모드에서 링 버퍼 위치
+    # draw=False 면 누적만 하고 그리기는 다음 호출로 미룬다
+    def update_plot(self, dist_list_cm, slot=None, draw=True):
+        if len(dist_list_cm) != self.grid_size**2:
+            return
+        t0 = time.perf_counter()
+
+        # ★ 깊이 영상에서 먼저 튀는 픽셀 / 깊이 경계 칸을 걸러낸다
+        depth = np.array(dist_list_cm, dtype=float).reshape(self.grid_size, self.grid_size)
+        face_ok = None
+        if DEPTH_FILTER:
+            before = np.count_nonzero(depth > 0)
+            depth, face_ok = filter_depth(depth, self.elevs, FILTER_REL_OUTLIER, FILTER_REL_EDGE)
+            FILTERED_PIXELS.inc(before - np.count_nonzero(depth > 0))
+
+        # ★ 이번 프레임의 N×N 좌표 (무효 셀은 NaN)
+        grid_pts = project_grid(depth, self.az_center, self.elevs, self.fov)
+        valid = ~np.isnan(grid_pts[..., 0])
+        if not valid.any():
             return
 
-        half_fov = FOV_DEG / 2.0
-        azims = [self.az_center - half_fov + i * FOV_DEG / (GRID_SIZE - 1)
-                 for i in range(GRID_SIZE)]
-
-        new_pts = []
-        # ★ 이번 프레임의 8×8 좌표를 2차원 배열로 저장
-        grid_pts = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                dist = dist_list_cm[r * GRID_SIZE + c]
-                if dist is None or dist <= 0:
-                    continue
-                az = math.radians(azims[c])
-                el = math.radians(self.elevs[r])
-                x = dist * math.sin(az) * math.cos(el)
-                y = dist * math.cos(az) * math.cos(el)
-                z = dist * math.sin(el)
-                pt = (x, y, z)
-                new_pts.append(pt)
-                grid_pts[r][c] = pt
-
-        if not new_pts:
+        # ★ 모터 스텝 오차 보정: 누적 클라우드에 정합해서 az_center 갱신
+        if self.registration is not None:
+            yaw = self.registration.align(grid_pts[valid])
+            if yaw:
+                self.az_center += yaw
+                grid_pts = rotate_z(grid_pts, yaw)
+            self.registration.insert(grid_pts[valid], grid_normals(grid_pts)[valid])
+
+        # ★ 센서(원점)에서 각 픽셀까지 광선으로 점유 격자 갱신
+        self.occupancy.integrate((0, 0, 0), grid_pts[valid])
+
+        # ★ 이번 프레임의 면: 깊이 경계 칸 제외
+        cells = cell_mask(grid_pts)
+        if face_ok is not None:
+            FILTERED_CELLS.inc(int(np.count_nonzero(cells & ~face_ok)))
+            cells &= face_ok
+
+        # ★ 이미 덮였고 깊이도 같은 칸은 건너뛰고, 같은 평면인 칸은 병합
+        if MESH_DECIMATE:
+            if slot is not None and slot[0] != self.coverage_rev:
+                self.coverage.reset()   # 연속 모드에서는 회전마다 새로 덮는다
+                self.coverage_rev = slot[0]
+            cells = self.coverage.cull(cells, self.az_center, self.fov, grid_pts)
+            new_quads = merge_coplanar(grid_pts, MESH_TOL, cells)
+        else:
+            new_quads = grid_quads(grid_pts, cells)
+
+        if self.ring is not None and slot is not None:
+            # ★ 연속 모드: 링 버퍼에 기록 (오래된 회전은 자동으로 밀려남)
+            self.ring.add(slot[0], slot[1], grid_pts, new_quads)
+        else:
+            # ★ 점/면 누적
+            self.all_points.append(grid_pts[valid])
+            self.all_quads.extend(new_quads)
+
+        PROJECT_TIME.observe(time.perf_counter() - t0)
+        if draw:
+            self.redraw()
+
+    # 누적 점/면 (연속 모드면 링 버퍼)
+    def display_points(self):
+        if self.ring is not None:
+            return self.ring.points()
+        if self.all_points:
+            return np.concatenate(self.all_points)
+        return np.empty((0, 3))
+
+    def display_quads(self):
+        if self.ring is not None:
+            return self.ring.quads()
+        return self.all_quads
+
+    # 스캔 종료 후 프레임 사이 동일 평면 병합 + 꼭짓점 군집화로 한 번 더 간소화
+    def finalize_mesh(self):
+        if not MESH_DECIMATE or self.ring is not None or not self.all_quads:
             return
+        quads = merge_coplanar_frames(self.all_quads, MESH_TOL)
+        self.all_quads = list(cluster_vertices(quads, MESH_CLUSTER))
+        self.redraw()
+
+    def export_mesh(self, path):
+        write_obj(path, self.display_quads())
 
-        # ★ 점 누적
-        self.all_points.extend(new_pts)
-
-        # ★ 이번 프레임에서 생성된 사각형(면)들을 만든 후, 누적 리스트에 추가
-        new_quads = []
-        for r in range(GRID_SIZE - 1):
-            for c in range(GRID_SIZE - 1):
-                p00 = grid_pts[r][c]
-                p01 = grid_pts[r][c+1]
-                p10 = grid_pts[r+1][c]
-                p11 = grid_pts[r+1][c+1]
-                # 네 점 중 하나라도 None이면 그 면은 스킵
-                if (p00 is None) or (p01 is None) or (p10 is None) or (p11 is None):
-                    continue
-                # 꼭짓점 순서: 시계/반시계 아무거나 일관되게
-                new_quads.append([p00, p01, p11, p10])
-
-        # ★ 모든 프레임의 면들을 누적
-        self.all_quads.extend(new_quads)
+    # 기준 세션과 비교해서 바뀐 곳 강조
+    def show_changes(self, changed_pts, removed_pts):
+        self.changes = (changed_pts, removed_pts)
+        self.redraw()
+
+    def clear_changes(self):
+        self.changes = None
+
+    def redraw(self):
+        with DRAW_TIME.time():
+            self._draw()
+
+    def _draw(self):
+        all_pts = self.display_points()
+        all_quads = self.display_quads()
 
         # ==== 다시 그리기 ====
         self.reset_axis()
 
-        # 1) 누적 점들
-        if self.all_points:
-            xs, ys, zs = zip(*self.all_points)
-            self.ax.scatter(xs, ys, zs, c='red', s=2)
+        # 1) 누적 점들 (+ 연속 모드 배경 모델)
+        if self.ring is not None:
+            bg_pts = self.ring.background_points()
+            if len(bg_pts):
+                self.ax.scatter(bg_pts[:, 0], bg_pts[:, 1], bg_pts[:, 2], c='gray', s=1)
+        if len(all_pts):
+            self.ax.scatter(all_pts[:, 0], all_pts[:, 1], all_pts[:, 2], c='red', s=2)
+
+        # 1-1) 비교 결과: 새로 생기거나 바뀐 곳(주황), 사라진 곳(하늘색)
+        if self.changes is not None:
+            for pts, color in zip(self.changes, ('orange', 'cyan')):
+                if len(pts):
+                    self.ax.scatter(pts[:, 0], pts[:, 1], pts[:, 2], c=color, s=12)
 
         # 2) 센서 위치
         self.ax.scatter([0], [0], [0], c='blue', s=30)
 
         # 3) 누적 면들(모든 프레임)
-        if self.all_quads:
+        if len(all_quads):
             surface = Poly3DCollection(
-                self.all_quads,
+                all_quads,
                 facecolors='red',
                 edgecolors='none',
                 alpha=0.25   # 투명도 (0~1), 필요하면 조절
@@ -134,55 +287,42 @@ class GraphWindow(QWidget):
 
 
 # ============================================================
-# 8×8 거리 표
+# N×N 거리 표
 # ============================================================
 class DistanceWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("8x8 Distance Array (cm)")
         self.setGeometry(0, 0, 400, 400)
-        layout = QGridLayout()
-        self.labels = [[QLabel("0.0") for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                layout.addWidget(self.labels[r][c], r, c)
-        self.setLayout(layout)
+        self.grid_layout = QGridLayout()
+        self.setLayout(self.grid_layout)
+        self.labels = []
+        self.set_grid_size(GRID_SIZE)
+
+    def set_grid_size(self, n):
+        # 해상도가 바뀌면 라벨을 다시 만든다
+        for row in self.labels:
+            for label in row:
+                self.grid_layout.removeWidget(label)
+                label.deleteLater()
+        self.grid_size = n
+        self.setWindowTitle(f"{n}x{n} Distance Array (cm)")
+        self.labels = [[QLabel("0.0") for _ in range(n)] for _ in range(n)]
+        for r in range(n):
+            for c in range(n):
+                self.grid_layout.addWidget(self.labels[r][c], r, c)
 
     def update_distances(self, dist_list_cm):
         for i, val in enumerate(dist_list_cm):
-            r = i // GRID_SIZE
-            c = i % GRID_SIZE
-            if val is None:
+            r = i // self.grid_size
+            c = i % self.grid_size
+            if val is None or math.isnan(val):
                 self.labels[r][c].setText("∞")
             else:
                 self.labels[r][c].setText(f"{val:.2f}")
 
 
 # ============================================================
-# UART 수신/송신
-# ============================================================
-class UARTReceiver:
-    def __init__(self, port, baud=115200):
-        self.ser = serial.Serial(port, baudrate=baud, timeout=0.1)
-
-    def read_line(self):
-        try:
-            line = self.ser.readline().decode(errors='ignore').strip()
-            if not line:
-                return None
-            return line
-        except:
-            return None
-
-    def send(self, msg):
-        try:
-            self.ser.write(msg.encode())
-        except:
-            pass
-
-
-# ============================================================
-# 메인 컨트롤러
+# 메인 컨트롤러 (GUI 프로세스)
 # ============================================================
 class MainController(QWidget):
     def __init__(self):
@@ -198,6 +338,20 @@ class MainController(QWidget):
         self.s_input.setPlaceholderText("Enter number of samples S")
         input_layout.addWidget(self.s_input)
 
+        # 센서 해상도 (세션 단위)
+        self.res_combo = QComboBox()
+        for n in sorted(RESOLUTIONS, reverse=True):
+            self.res_combo.addItem(f"{n}x{n}", n)
+        input_layout.addWidget(self.res_combo)
+
+        # 적응형 샘플링 on/off
+        self.adaptive_check = QCheckBox("Adaptive")
+        input_layout.addWidget(self.adaptive_check)
+
+        # 연속 매핑 (회전 반복, 최근 회전만 유지)
+        self.continuous_check = QCheckBox("Continuous")
+        input_layout.addWidget(self.continuous_check)
+
         # 좌표 표시용 QLabel
         self.coord_label = QLabel("Current angle: 0°")
         input_layout.addWidget(self.coord_label)
@@ -213,33 +367,92 @@ class MainController(QWidget):
         self.start_btn.clicked.connect(self.start_process)
         main_layout.addWidget(self.start_btn)
 
+        # STOP 버튼 (현재 스텝 측정 후 종료)
+        self.stop_btn = QPushButton("STOP")
+        self.stop_btn.clicked.connect(self.stop_process)
+        main_layout.addWidget(self.stop_btn)
+
+        # EXPORT 버튼 (간소화된 면을 OBJ 로 저장)
+        self.export_btn = QPushButton("EXPORT MESH")
+        self.export_btn.clicked.connect(self.export_mesh)
+        main_layout.addWidget(self.export_btn)
+
+        # COMPARE 버튼 (기준 세션을 골라 마지막 기록 세션과 비교)
+        self.compare_btn = QPushButton("COMPARE")
+        self.compare_btn.clicked.connect(self.compare_sessions)
+        main_layout.addWidget(self.compare_btn)
+
         # 정보/수신 데이터 표시
         self.info_label = QLabel("")
         main_layout.addWidget(self.info_label)
         self.received_label = QLabel("Received data:")
         main_layout.addWidget(self.received_label)
 
+        # 상태 표시줄 (처리량/큐/처리 시간/진행률)
+        self.status_label = QLabel("")
+        self.status_label.setVisible(SHOW_STATUS)
+        main_layout.addWidget(self.status_label)
+
         self.setLayout(main_layout)
 
         # 3D 그래프
         self.graph_win = GraphWindow()
 
-        # UART
-        self.uart_alg = UARTReceiver("/dev/ttyAMA2")  # UART2
-        self.uart_mes = UARTReceiver("/dev/ttyAMA3")
-
         # 상태 변수
         self.S = 0
-        self.SC = 0.0
         self.C = 0
-        self.transmission_active = False
-        self.wait_for_rf = False
+        self.total = 0          # 이번 스캔에서 계획된 프레임 수
+        self.continuous = False
+        self.grid_size = GRID_SIZE
+        self.yaw_offset = 0.0   # 정합으로 추정한 누적 스텝 오차 (deg)
+        self.session_path = None    # 마지막으로 기록한 세션 디렉터리
+
+        # 수집 프로세스: UART 입출력과 스캔 진행을 맡고, 프레임은 공유 메모리 링으로 전달
+        # spawn 자식은 __main__ 모듈을 다시 import 하므로 main.py 로 실행해야 GUI 를 올리지 않는다
+        ctx = mp.get_context("spawn")
+        self.ring = FrameRing(slots=RING_SLOTS)
+        self.read_seq = self.ring.latest()
+        self.dropped = 0
+        self.commands = ctx.Queue()
+        self.events = ctx.Queue()
+        self.acq = ctx.Process(
+            target=run_acquisition, args=(self.ring.name, self.commands, self.events),
+            kwargs={"verbose": VERBOSE}, daemon=True)
+        self.acq.start()
+        self.acq_error = None   # 수집 프로세스가 보낸 마지막 오류
+        self.acq_exited = False
+
+        self.stats = {"alg": {}, "mes": {}}   # 수집 프로세스가 주기적으로 보내는 UART 통계
+        self.register_metrics()
 
         # 타이머
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_loop)
         self.timer.start(50)
 
+        # 상태 표시줄 갱신 (1초)
+        self.last_frames = SCAN_FRAMES.get()
+        self.last_status_t = time.perf_counter()
+        self.status_timer = QTimer()
+        self.status_timer.timeout.connect(self.update_status)
+        if SHOW_STATUS:
+            self.status_timer.start(1000)
+
+    def register_metrics(self):
+        for port in ("alg", "mes"):
+            labels = {"port": port}
+            for key in ("bytes", "lines", "frames", "short_frames", "parse_failures", "resyncs"):
+                METRICS.counter(f"uart_{key}_total", f"UART {key.replace('_', ' ')} received",
+                                labels, fn=lambda port=port, key=key: self.stats[port].get(key, 0))
+            METRICS.gauge("uart_queue_bytes", "Bytes waiting in the driver at the last read",
+                          labels, fn=lambda port=port: self.stats[port].get("backlog", 0))
+            METRICS.gauge("uart_partial_bytes", "Partial line bytes held by the tokenizer",
+                          labels, fn=lambda port=port: self.stats[port].get("partial", 0))
+        METRICS.gauge("frame_ring_lag", "Frames written to the ring but not yet drawn",
+                      fn=lambda: self.ring.latest() - self.read_seq)
+        METRICS.counter("frame_ring_dropped_total", "Frames overwritten before the GUI read them",
+                        fn=lambda: self.dropped)
+
     # --------------------------------------------------------
     def start_process(self):
         try:
@@ -248,88 +461,191 @@ class MainController(QWidget):
             self.info_label.setText("Invalid input for S")
             return
 
-        self.SC = 360 / self.S
         self.C = 0
-        self.transmission_active = True
-        self.wait_for_rf = False
+        self.total = self.S
+        self.continuous = self.continuous_check.isChecked()
+        # 연속 모드는 균일 스텝만 사용
+        adaptive = self.adaptive_check.isChecked() and not self.continuous
+        self.yaw_offset = 0.0
+        self.graph_win.clear_changes()
+        self.graph_win.reset_maps()
+
+        # 해상도 적용: 센서 설정 → 파서/투영/표 모두 같은 N 사용
+        self.grid_size = self.res_combo.currentData()
+        self.graph_win.set_grid_size(self.grid_size)
+        self.distance_win.set_grid_size(self.grid_size)
+        if self.continuous:
+            self.graph_win.start_continuous(RING_REVOLUTIONS, self.S)
+        else:
+            self.graph_win.stop_continuous()
 
         print(f"=== START ===")
-        print(f"S = {self.S}, SC = {self.SC:.3f}°")
-        self.info_label.setText(f"Transmission started: SC={self.SC:.2f}°")
-
-        # 첫 SC 전송
-        self.send_SC()
+        print(f"S = {self.S}, SC = {360 / self.S:.3f}°, {self.grid_size}x{self.grid_size}")
+
+        self.commands.put(("start", {
+            "S": self.S,
+            "grid_size": self.grid_size,
+            "continuous": self.continuous,
+            "rounds": ADAPT_ROUNDS if adaptive else 0,
+            "span": self.graph_win.fov,
+            "fov": FOV_DEG,
+            "record_dir": SESSION_DIR,
+            "rel_thresh": ADAPT_REL_THRESH,
+            "min_step": ADAPT_MIN_STEP,
+        }))
         self.graph_win.show()
 
-    # SC 전송
-    def send_SC(self):
-        if not self.transmission_active:
+    # 남은 계획을 비워서 현재 스텝 측정 후 RM 으로 종료
+    def stop_process(self):
+        self.commands.put(("stop",))
+
+    def update_status(self):
+        now = time.perf_counter()
+        # 수집 쪽 통계는 같은 1 초 주기로 와서 0 / 두 배를 오간다 → GUI 가 처리한 프레임으로 센다
+        frames = SCAN_FRAMES.get()
+        rate = (frames - self.last_frames) / (now - self.last_status_t)
+        self.last_frames, self.last_status_t = frames, now
+
+        fails = sum(st.get("parse_failures", 0) + st.get("short_frames", 0)
+                    for st in self.stats.values())
+        self.status_label.setText(
+            f"{rate:.1f} fr/s | fail {fails} | queue {self.stats['mes'].get('backlog', 0)} B | "
+            f"lag {self.ring.latest() - self.read_seq} | "
+            f"proj {PROJECT_TIME.last * 1e3:.1f} ms | draw {DRAW_TIME.last * 1e3:.0f} ms | "
+            f"{self.C}/{self.total}")
+
+    def export_mesh(self):
+        path = time.strftime("scan_%Y%m%d_%H%M%S.obj")
+        self.graph_win.export_mesh(path)
+        self.info_label.setText(f"Mesh exported: {path}")
+
+    def compare_sessions(self):
+        if self.session_path is None:
+            self.info_label.setText("No recorded session to compare")
+            return
+        ref = QFileDialog.getExistingDirectory(self, "Reference session", SESSION_DIR or ".")
+        if not ref:
+            return
+        try:
+            report, changed, removed = diff_sessions(ref, self.session_path, fov_deg=FOV_DEG)
+        except (OSError, KeyError, ValueError) as e:
+            self.info_label.setText(f"Compare failed: {e}")
             return
-        msg = f"{self.SC:.3f}\n"
-        self.uart_alg.send(msg)
-        print(f"TX(SC): {msg.strip()}")
 
-    # MeS 전송
-    def send_MeS(self):
-        self.uart_mes.send("MeS\n")
-        print("MeS sent")
+        # 요약 보고서는 현재 세션 디렉터리에 저장
+        path = os.path.join(self.session_path, f"diff_{report['reference']}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, separators=(",", ":"))
+        self.graph_win.show_changes(changed, removed)
+        self.graph_win.show()
+        px = report["pixels"]
+        self.info_label.setText(
+            f"Changed {px['changed'] + px['appeared'] + report['rays']['added']} / "
+            f"removed {px['vanished'] + report['rays']['removed']} points "
+            f"({report['elapsed_ms']:.0f} ms) → {path}")
 
-    # UART 수신 처리
+    # 링에서 새 프레임을 읽고 수집 프로세스 이벤트 처리
     def update_loop(self):
-        if self.wait_for_rf:
-            line_alg = self.uart_alg.read_line()
-            if line_alg:
-                print(f"RX Alg: {line_alg}")
-                if line_alg == "RF":
-                    print("=== RF received, transmission ended ===")
-                    self.wait_for_rf = False
+        head = self.ring.latest()
+        if head - self.read_seq > len(self.ring):
+            # GUI 가 너무 늦어서 링이 한 바퀴 넘게 앞서감
+            self.dropped += head - self.read_seq - len(self.ring)
+            self.read_seq = head - len(self.ring)
+
+        while self.read_seq < head:
+            self.read_seq += 1
+            slot = self.ring.read(self.read_seq)
+            if slot is None:
+                self.dropped += 1
+                continue
+            # 공유 메모리 슬롯에서 바로 읽는다 (cm 변환이 유일한 새 배열)
+            n = int(slot["grid_size"])
+            grid = slot["grid"][:n * n]
+            dist_list_cm = np.where(grid > 0, grid / 10.0, np.nan)
+            angle, index = float(slot["angle"]), int(slot["index"])
+            if not self.ring.valid(self.read_seq):
+                self.dropped += 1
+                continue
+            # 한 틱에 여러 프레임이 오면 그리기는 마지막에 한 번만
+            self.handle_frame(angle, index, dist_list_cm, draw=self.read_seq == head)
+
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_event(event)
+
+        # 수집 프로세스가 끝났으면 (예외 / 강제 종료) 한 번만 알리고 START 를 막는다
+        if not self.acq_exited and not self.acq.is_alive():
+            self.acq_exited = True
+            self.start_btn.setEnabled(False)
+            self.stop_btn.setEnabled(False)
+            msg = self.acq_error or f"exit code {self.acq.exitcode}"
+            print(f"=== Acquisition process stopped: {msg} ===")
+            self.info_label.setText(f"Acquisition stopped: {msg}")
+
+    def handle_event(self, event):
+        kind = event[0]
+        if kind == "log":
+            log(event[1])
+        elif kind == "info":
+            self.info_label.setText(event[1])
+        elif kind == "rx":
+            self.received_label.setText(f"Received data: {event[1]}")
+        elif kind == "stats":
+            self.stats = event[1]
+        elif kind == "progress":
+            self.C, self.total = event[1], event[2]
+            SCAN_PROGRESS.set(self.C / self.total)
+            log(f"COUNT = {self.C}/{self.total}")
+        elif kind == "revolution":
+            print(f"=== Revolution {event[1]} done ===")
+        elif kind == "scan_done":
+            print("== RM sent to UART2, waiting for RF ==")
+            self.graph_win.finalize_mesh()
+        elif kind == "session":
+            self.session_path = event[1]
+        elif kind == "rf":
+            print("=== RF received, transmission ended ===")
+        elif kind == "error":
+            self.acq_error = event[1]
+            print(f"=== Acquisition error: {event[1]} ===")
+            self.info_label.setText(f"Acquisition error: {event[1]}")
+
+    # 측정 프레임 1개 처리
+    def handle_frame(self, commanded, index, dist_list_cm, draw=True):
+        # 명령 각도 + 지금까지 추정된 오차를 초기값으로 정합
+        slot = None
+        if self.continuous:
+            slot = (index // self.S, index % self.S)
+        self.graph_win.az_center = commanded + self.yaw_offset
+        self.graph_win.update_plot(dist_list_cm, slot, draw)
+
+        current_angle = self.graph_win.az_center
+        self.yaw_offset = current_angle - commanded
+        SCAN_FRAMES.inc()
+        if draw:
+            self.coord_label.setText(
+                f"Current angle: {current_angle:.2f}° (cmd {commanded:.2f}°)")
+            self.distance_win.update_distances(dist_list_cm)
+
+    def shutdown(self):
+        if self.acq is None:
             return
+        self.timer.stop()
+        self.commands.put(("quit",))
+        self.acq.join(timeout=1.0)
+        if self.acq.is_alive():
+            self.acq.terminate()
+        self.acq = None
+        self.ring.close()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
 
-        line_alg = self.uart_alg.read_line()
-        if line_alg:
-            print(f"RX Alg: {line_alg}")
-            if line_alg == "RF":
-                self.transmission_active = False
-                print("=== RF received, transmission ended ===")
-                return
-            if line_alg == "MF":
-                print("MF received, triggering MeS in 2s")
-                QTimer.singleShot(2000, self.send_MeS)
-
-        line_mes = self.uart_mes.read_line()
-        if line_mes:
-            print(f"RX MeS: {line_mes}")
-            self.received_label.setText(f"Received data: {line_mes}")
-
-            parts = line_mes.split(",")
-            if len(parts) == GRID_SIZE**2:
-                dist_list_cm = []
-                for x in parts:
-                    try:
-                        dist_list_cm.append(float(x) / 10.0)
-                    except:
-                        dist_list_cm.append(None)
-
-                current_angle = self.C * self.SC
-                self.graph_win.az_center = current_angle
-                self.coord_label.setText(f"Current angle: {current_angle:.2f}°")
-
-                self.graph_win.update_plot(dist_list_cm)
-                self.distance_win.update_distances(dist_list_cm)
-
-                self.C += 1
-                print(f"COUNT = {self.C}/{self.S}")
-
-                if self.C < self.S:
-                    QTimer.singleShot(100, self.send_SC)
-                elif self.C == self.S:
-                    # RM 신호를 UART2로 전송
-                    self.uart_alg.send("RM\n")
-                    print("== RM sent to UART2, waiting for RF ==")
-                    self.transmission_active = False
-                    self.wait_for_rf = True
-
-    # --------------------------------------------------------/'
+    # --------------------------------------------------------
     def start(self):
         self.show()
 
@@ -337,8 +653,15 @@ class MainController(QWidget):
 # ============================================================
 # 실행
 # ============================================================
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+def main(argv=None):
+    app = QApplication(sys.argv if argv is None else argv)
     controller = MainController()
+    if METRICS_PORT is not None:
+        start_http_server(METRICS, METRICS_PORT)
+    app.aboutToQuit.connect(controller.shutdown)
     controller.start()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
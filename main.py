@@ -0,0 +1,16 @@
+import sys
+
+
+# ============================================================
+# 실행: python main.py
+# 수집 프로세스 (spawn) 는 시작할 때 __main__ 모듈을 다시 import 한다
+# good_file.py 를 직접 실행하면 자식도 PyQt5 / matplotlib 을 올리고 메트릭을 등록하므로
+# GUI 는 main() 안에서만 import 해서 자식은 이 파일과 acquisition 만 읽게 한다
+# ============================================================
+def main(argv=None):
+    from good_file import main as run_gui
+    return run_gui(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
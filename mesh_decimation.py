@@ -0,0 +1,211 @@
+import numpy as np
+
+
+# ============================================================
+# 프레임 단위: 격자에서 거의 같은 평면인 이웃 칸들을 큰 사각형으로 병합
+# ============================================================
+def _planar(block, tol):
+    # block: (h+1, w+1, 3) 꼭짓점, 최소제곱 평면에서 tol 이내인지
+    pts = block.reshape(-1, 3)
+    centered = pts - pts.mean(axis=0)
+    normal = np.linalg.svd(centered, full_matrices=False)[2][-1]
+    return np.abs(centered @ normal).max() <= tol
+
+
+def cell_mask(grid_pts):
+    # (N-1, N-1): 네 꼭짓점이 모두 유효한 칸
+    ok = ~np.isnan(grid_pts).any(axis=-1)
+    return ok[:-1, :-1] & ok[:-1, 1:] & ok[1:, :-1] & ok[1:, 1:]
+
+
+def merge_coplanar(grid_pts, tol=1.0, cells=None):
+    # grid_pts: (N, N, 3), 무효 NaN → 병합된 사각형 (K, 4, 3)
+    # cells: 면을 만들 칸 마스크 (기본은 유효한 칸 전부)
+    cell_ok = cell_mask(grid_pts) if cells is None else cells
+    m = cell_ok.shape[0]
+    used = np.zeros_like(cell_ok)
+
+    quads = []
+    for r in range(m):
+        for c in range(m):
+            if not cell_ok[r, c] or used[r, c]:
+                continue
+            # 오른쪽으로 먼저 넓히고
+            w = 1
+            while (c + w < m and cell_ok[r, c + w] and not used[r, c + w]
+                   and _planar(grid_pts[r:r + 2, c:c + w + 2], tol)):
+                w += 1
+            # 그 폭 그대로 아래로 넓힌다
+            h = 1
+            while (r + h < m and cell_ok[r + h, c:c + w].all() and not used[r + h, c:c + w].any()
+                   and _planar(grid_pts[r:r + h + 2, c:c + w + 1], tol)):
+                h += 1
+            used[r:r + h, c:c + w] = True
+            quads.append([grid_pts[r, c], grid_pts[r, c + w],
+                          grid_pts[r + h, c + w], grid_pts[r + h, c]])
+
+    if not quads:
+        return np.empty((0, 4, 3))
+    return np.array(quads)
+
+
+# ============================================================
+# 프레임 단위: 같은 원점에서 이미 덮였고 깊이도 맞는 칸은 건너뜀
+# ============================================================
+class AngularCoverage:
+    # 센서는 원점에서 yaw 만 하므로 (행 띠, 방위각) 으로 덮인 영역을 기록할 수 있다
+    # 방위각만 보면 깊이가 달라진 칸(적응형 재측정, 처음 잘못 찍힌 값)까지 버리므로
+    # 띠·방위각 칸마다 마지막으로 면을 만든 칸의 평면을 같이 기록하고
+    # 네 꼭짓점이 그 평면에서 tol 이내인 칸만 버린다
+    def __init__(self, bands, bin_deg=0.5, min_frac=0.9, tol=1.0):
+        self.bin_deg = bin_deg
+        self.min_frac = min_frac    # 이 비율 이상 덮인 칸이 버릴 후보
+        self.tol = tol              # 후보의 꼭짓점이 기록된 평면에서 이 거리 (cm) 이내여야 버림
+        nbins = int(round(360.0 / bin_deg))
+        self.covered = np.zeros((bands, nbins), dtype=bool)
+        self.normal = np.full((bands, nbins, 3), np.nan)
+        self.offset = np.full((bands, nbins), np.nan)
+
+    def reset(self):
+        self.covered[:] = False
+        self.normal[:] = np.nan
+        self.offset[:] = np.nan
+
+    def on_surface(self, grid_pts, idx):
+        # (N-1, N-1): 네 꼭짓점이 기록된 평면에서 tol 이내인 칸 (기록 없으면 False)
+        # 왼쪽 꼭짓점은 칸 구간에서 평면이 기록된 첫 방위각, 오른쪽은 마지막 방위각의 평면과 비교
+        bands = np.arange(self.covered.shape[0])[:, None]
+        has = ~np.isnan(self.offset[:, idx])                                 # (N-1, m, W)
+        first = idx[np.arange(idx.shape[0]), np.argmax(has, axis=-1)]
+        last = idx[np.arange(idx.shape[0]), idx.shape[1] - 1 - np.argmax(has[..., ::-1], axis=-1)]
+        near = np.ones(has.shape[:2], dtype=bool)
+        for dr, dc, b in ((0, 0, first), (0, 1, last), (1, 0, first), (1, 1, last)):
+            v = grid_pts[dr:dr + near.shape[0], dc:dc + near.shape[1]]
+            n, off = self.normal[bands, b], self.offset[bands, b]
+            with np.errstate(invalid='ignore'):
+                near &= np.abs(np.sum(n * v, axis=-1) + off) <= self.tol
+        return near
+
+    def cull(self, cells, az_center, span_deg, grid_pts):
+        # cells: (N-1, N-1) 칸 마스크, grid_pts: (N, N, 3) → 새로 덮거나 깊이가 다른 칸만 남긴 마스크
+        m = cells.shape[1]
+        pitch = span_deg / m
+        nbins = self.covered.shape[1]
+        start = np.rint((az_center - span_deg / 2.0 + np.arange(m) * pitch) / self.bin_deg)
+        width = max(1, int(round(pitch / self.bin_deg)))
+        idx = (start.astype(np.int64)[:, None] + np.arange(width)) % nbins   # (m, W)
+
+        frac = self.covered[:, idx].mean(axis=-1)                            # (N-1, m)
+        drop = cells & (frac >= self.min_frac)
+        if drop.any():
+            drop &= self.on_surface(grid_pts, idx)
+        keep = cells & ~drop
+        r, c = np.nonzero(keep)
+        self.covered[r[:, None], idx[c]] = True
+
+        # 남긴 칸의 평면 (대각선 외적 + 중심) 으로 덮어쓴다 → 최신 측정이 기준
+        if len(r):
+            p00, p01 = grid_pts[r, c], grid_pts[r, c + 1]
+            p11, p10 = grid_pts[r + 1, c + 1], grid_pts[r + 1, c]
+            nrm = np.cross(p11 - p00, p01 - p10)
+            nrm /= np.linalg.norm(nrm, axis=1, keepdims=True)
+            off = -np.sum(nrm * (p00 + p01 + p11 + p10) / 4.0, axis=1)
+            self.normal[r[:, None], idx[c]] = nrm[:, None]
+            self.offset[r[:, None], idx[c]] = off[:, None]
+        return keep
+
+
+# ============================================================
+# 스캔 후: 프레임 사이에서 같은 행 띠의 이웃한 동일 평면 면을 병합
+# ============================================================
+def _angles(verts):
+    # (..., 3) → 방위각, 고도각 (deg), projection 과 같은 기준 (y 축 = 0°, x 쪽 +)
+    az = np.degrees(np.arctan2(verts[..., 0], verts[..., 1]))
+    el = np.degrees(np.arctan2(verts[..., 2], np.hypot(verts[..., 0], verts[..., 1])))
+    return az, el
+
+
+def merge_coplanar_frames(quads, tol=1.0, gap_deg=0.5, max_deg=60.0):
+    # quads: merge_coplanar 순서 [(r,c), (r,c+w), (r+h,c+w), (r+h,c)] 의 사각형들 (K, 4, 3)
+    # 행 띠 (위/아래 고도각) 가 같고 방위각 구간이 겹치거나 gap_deg 이내로 붙어 있으며
+    # 병합한 면이 원래 꼭짓점 전부에서 tol 이내면 하나로 합친다
+    # 병합 면의 방위각 폭은 max_deg 까지 (한 프레임 안에서 merge_coplanar 가 만드는 크기 정도)
+    quads = np.asarray(quads, dtype=float).reshape(-1, 4, 3)
+    if len(quads) < 2:
+        return quads
+    az, el = _angles(quads)
+    left, right = az[:, 0], az[:, 1]
+    band = np.rint(el[:, [0, 3]] * 10).astype(np.int64)    # 0.1° 단위 행 띠
+    # ±180° 를 걸친 면은 그대로 둔다
+    mergeable = (right > left) & ~np.isnan(left)
+
+    out = [quads[~mergeable]]
+    idx = np.flatnonzero(mergeable)
+    order = idx[np.lexsort((left[idx], band[idx, 1], band[idx, 0]))]
+    cur, block, cur_right = None, None, None
+    for i in order:
+        q = quads[i]
+        if (cur is not None and (band[i] == band[cur[-1]]).all()
+                and left[i] <= cur_right + gap_deg and right[i] > cur_right
+                and right[i] - left[cur[0]] <= max_deg
+                and _planar(np.concatenate([block, q]), tol)):
+            cur.append(i)
+            block = np.concatenate([block, q])
+            cur_right = right[i]
+            continue
+        if cur is not None:
+            out.append(_span_quad(quads, cur)[None])
+        cur, block, cur_right = [i], q, right[i]
+    if cur is not None:
+        out.append(_span_quad(quads, cur)[None])
+    return np.concatenate(out)
+
+
+def _span_quad(quads, chain):
+    # 첫 면의 왼쪽 변 + 마지막 면의 오른쪽 변
+    a, b = quads[chain[0]], quads[chain[-1]]
+    return np.array([a[0], b[1], b[2], a[3]])
+
+
+# ============================================================
+# 스캔 후: 꼭짓점 군집화로 짧은 모서리 붕괴 (오차 ≤ 셀 대각선)
+# ============================================================
+def cluster_vertices(quads, cell=2.0):
+    quads = np.asarray(quads, dtype=float).reshape(-1, 4, 3)
+    if len(quads) == 0:
+        return quads
+    verts = quads.reshape(-1, 3)
+    keys = np.floor(verts / cell).astype(np.int64)
+    _, vid, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    vid = vid.reshape(-1)
+
+    # 셀마다 대표점 = 들어온 꼭짓점들의 평균
+    rep = np.zeros((len(counts), 3))
+    np.add.at(rep, vid, verts)
+    rep /= counts[:, None]
+
+    face = vid.reshape(-1, 4)
+    # 꼭짓점이 3개 미만으로 줄어든 면은 버림 (모서리 붕괴)
+    s = np.sort(face, axis=1)
+    distinct = 1 + (np.diff(s, axis=1) != 0).sum(axis=1)
+    keep = distinct >= 3
+    face, s = face[keep], s[keep]
+
+    # 같은 꼭짓점 집합을 가진 중복 면 제거 (겹쳐 찍힌 프레임)
+    _, first = np.unique(s, axis=0, return_index=True)
+    face = face[np.sort(first)]
+    return rep[face]
+
+
+# ============================================================
+# OBJ 내보내기
+# ============================================================
+def write_obj(path, quads):
+    quads = np.asarray(quads, dtype=float).reshape(-1, 4, 3)
+    verts, vid = np.unique(quads.reshape(-1, 3), axis=0, return_inverse=True)
+    face = vid.reshape(-1, 4) + 1
+    with open(path, "w") as f:
+        for x, y, z in verts:
+            f.write(f"v {x:.3f} {y:.3f} {z:.3f}\n")
+        for a, b, c, d in face:
+            f.write(f"f {a} {b} {c} {d}\n")
@@ -0,0 +1,154 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ============================================================
+# 프로세스 내 메트릭 (카운터/게이지/히스토그램) + Prometheus 텍스트
+# ============================================================
+def _label_str(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, fn=None):
+        self.value = 0
+        self.fn = fn    # 값을 다른 곳(예: 토크나이저 통계)에서 읽어올 때
+
+    def inc(self, n=1):
+        self.value += n
+
+    def get(self):
+        return self.fn() if self.fn is not None else self.value
+
+    def samples(self, name, labels):
+        yield name, labels, self.get()
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, v):
+        self.value = v
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.last = 0.0
+
+    def observe(self, v):
+        self.last = v
+        self.sum += v
+        self.count += 1
+        for i, b in enumerate(self.buckets):
+            if v <= b:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self, name, labels):
+        acc = 0
+        for b, c in zip(self.buckets + [float("inf")], self.counts):
+            acc += c
+            le = "+Inf" if b == float("inf") else repr(b)
+            yield name + "_bucket", dict(labels, le=le), acc
+        yield name + "_sum", labels, self.sum
+        yield name + "_count", labels, self.count
+
+
+class _Timer:
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}   # name → (help, kind, {label tuple: metric})
+
+    def _get(self, name, help_text, labels, factory):
+        key = tuple(sorted((labels or {}).items()))
+        with self.lock:
+            children = self.families.get(name, (None, None, {}))[2]
+            metric = children.get(key)
+            if metric is None:
+                metric = factory()
+                children[key] = metric
+                self.families[name] = (help_text, metric.kind, children)
+        return metric
+
+    def counter(self, name, help_text, labels=None, fn=None):
+        return self._get(name, help_text, labels, lambda: Counter(fn))
+
+    def gauge(self, name, help_text, labels=None, fn=None):
+        return self._get(name, help_text, labels, lambda: Gauge(fn))
+
+    def histogram(self, name, help_text, labels=None, buckets=TIME_BUCKETS):
+        return self._get(name, help_text, labels, lambda: Histogram(buckets))
+
+    def render(self):
+        lines = []
+        with self.lock:
+            families = list(self.families.items())
+        for name, (help_text, kind, children) in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in list(children.items()):
+                try:
+                    for sname, labels, value in metric.samples(name, dict(key)):
+                        lines.append(f"{sname}{_label_str(labels)} {value}")
+                except Exception:
+                    continue
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+# ============================================================
+# 로컬 HTTP 엔드포인트 (/metrics)
+# ============================================================
+def start_http_server(registry, port=9108, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,153 @@
+import numpy as np
+
+
+# ============================================================
+# 누적 점유 격자 (log-odds, 필요할 때마다 영역 확장)
+# ============================================================
+class OccupancyMap:
+    def __init__(self, voxel=5.0, extent=200.0, max_range=400.0,
+                 l_hit=0.85, l_miss=-0.4, l_min=-2.0, l_max=3.5, l_occ=0.5, l_free=-0.5):
+        self.voxel = float(voxel)
+        self.max_range = max_range  # 이보다 먼 측정은 max_range 까지 빈칸으로만 반영 (격자 크기 상한)
+        self.l_hit, self.l_miss = l_hit, l_miss
+        self.l_min, self.l_max = l_min, l_max
+        self.l_occ, self.l_free = l_occ, l_free   # 점유/빈칸 판정 임계값
+
+        n = int(np.ceil(2 * extent / self.voxel))
+        self.origin = np.full(3, -n // 2, dtype=np.int64)   # grid[0,0,0] 의 셀 좌표
+        self.grid = np.zeros((n, n, n), dtype=np.float32)
+        self.occ = np.zeros((n, n, n), dtype=bool)   # grid >= l_occ, 바뀐 셀만 갱신
+
+    # --------------------------------------------------------
+    # 좌표 ↔ 셀
+    # --------------------------------------------------------
+    def _cells(self, pts):
+        return np.floor(np.asarray(pts, dtype=float) / self.voxel).astype(np.int64)
+
+    def _local(self, pts):
+        # 격자 인덱스 (M, 3)와 격자 안에 있는지 여부
+        idx = self._cells(pts) - self.origin
+        inside = np.all((idx >= 0) & (idx < self.grid.shape), axis=-1)
+        return idx, inside
+
+    def _ensure(self, pts):
+        # 점들이 격자 밖이면 두 배씩 넓힌다
+        cells = self._cells(pts)
+        lo = np.minimum(cells.min(axis=0), self.origin)
+        hi = np.maximum(cells.max(axis=0) + 1, self.origin + self.grid.shape)
+        if np.all(lo == self.origin) and np.all(hi == self.origin + self.grid.shape):
+            return
+        size = np.array(self.grid.shape)
+        pad_lo = np.where(lo < self.origin, np.maximum(self.origin - lo, size // 2), 0)
+        pad_hi = np.where(hi > self.origin + size, np.maximum(hi - self.origin - size, size // 2), 0)
+        self.grid = np.pad(self.grid, list(zip(pad_lo, pad_hi)))
+        self.occ = np.pad(self.occ, list(zip(pad_lo, pad_hi)))
+        self.origin = self.origin - pad_lo
+
+    def _lookup(self, pts):
+        idx, inside = self._local(pts)
+        out = np.zeros(idx.shape[:-1], dtype=np.float32)
+        i = idx[inside]
+        out[inside] = self.grid[i[:, 0], i[:, 1], i[:, 2]]
+        return out
+
+    # --------------------------------------------------------
+    # 프레임 반영: 광선 경로는 빈칸, 끝점은 점유
+    # --------------------------------------------------------
+    def integrate(self, origin, hits):
+        hits = np.asarray(hits, dtype=float).reshape(-1, 3)
+        hits = hits[~np.isnan(hits).any(axis=1)]
+        if len(hits) == 0:
+            return
+        origin = np.asarray(origin, dtype=float)
+
+        # 너무 먼 측정은 max_range 에서 자르고 끝점을 점유로 치지 않는다
+        vec = hits - origin
+        length = np.linalg.norm(vec, axis=1)
+        far = length > self.max_range
+        if far.any():
+            vec[far] *= (self.max_range / length[far])[:, None]
+            length[far] = self.max_range
+            hits = origin + vec
+        self._ensure(np.vstack([hits, origin]))
+
+        step = self.voxel / 2.0
+        k = np.arange(int(np.ceil(length.max() / step)))
+        t = k[None, :] * step                          # (1, K)
+        along = t < (length[:, None] - self.voxel)     # 끝점 바로 앞까지만 빈칸
+        samples = origin + vec[:, None, :] * (t / np.maximum(length, 1e-9)[:, None])[..., None]
+
+        shape = self.grid.shape
+        hit_idx, _ = self._local(hits[~far])
+        hit_flat = np.unique(np.ravel_multi_index(hit_idx.T, shape))
+        free_idx, _ = self._local(samples[along])
+        free_flat = np.setdiff1d(np.ravel_multi_index(free_idx.T, shape), hit_flat)
+
+        flat = self.grid.reshape(-1)
+        flat[free_flat] = np.maximum(flat[free_flat] + self.l_miss, self.l_min)
+        flat[hit_flat] = np.minimum(flat[hit_flat] + self.l_hit, self.l_max)
+        occ = self.occ.reshape(-1)
+        occ[free_flat] = flat[free_flat] >= self.l_occ
+        occ[hit_flat] = flat[hit_flat] >= self.l_occ
+
+    # --------------------------------------------------------
+    # 질의
+    # --------------------------------------------------------
+    def state(self, pts):
+        # 1 = 점유, -1 = 빈칸, 0 = 미확인
+        lo = self._lookup(pts)
+        return np.where(lo >= self.l_occ, 1, np.where(lo <= self.l_free, -1, 0)).astype(np.int8)
+
+    def is_occupied(self, pts):
+        return self._lookup(pts) >= self.l_occ
+
+    def is_free(self, pts):
+        return self._lookup(pts) <= self.l_free
+
+    def raycast(self, origin, directions, max_range=400.0):
+        # 각 방향으로 가장 가까운 점유 셀까지의 거리, 없으면 inf
+        d = np.asarray(directions, dtype=float).reshape(-1, 3)
+        d = d / np.linalg.norm(d, axis=1, keepdims=True)
+        shape = np.array(self.grid.shape)
+        start = np.asarray(origin, dtype=float) / self.voxel - self.origin
+
+        # 격자를 벗어나는 거리까지만 샘플링 (가장 늦게 나가는 광선 기준)
+        safe = np.where(d == 0, 1.0, d)
+        exit_t = np.where(d > 0, (shape - start) / safe, np.where(d < 0, -start / safe, np.inf))
+        reach = min(max_range, exit_t.min(axis=1).max() * self.voxel + self.voxel)
+        t = np.arange(0.0, max(reach, 0.0), self.voxel)
+
+        # 축마다 따로 셀 번호 → 평탄 인덱스 (float32/int32 로 메모리 트래픽 절반)
+        steps = (t / self.voxel).astype(np.float32)
+        flat = np.zeros((len(d), len(t)), dtype=np.int64)
+        inside = np.ones((len(d), len(t)), dtype=bool)
+        strides = (shape[1] * shape[2], shape[2], 1)
+        for ax in range(3):
+            i = np.floor(np.float32(start[ax]) + np.outer(d[:, ax].astype(np.float32), steps))
+            i = i.astype(np.int32)
+            inside &= (i >= 0) & (i < shape[ax])
+            flat += i * strides[ax]
+        occ = self.occ.reshape(-1)[np.where(inside, flat, 0)] & inside
+        first = np.argmax(occ, axis=1)
+        return np.where(occ.any(axis=1), t[first], np.inf)
+
+    def range_query(self, lo, hi):
+        # 상자 [lo, hi] 안의 점유 셀 중심 좌표
+        a = np.clip(self._cells(lo) - self.origin, 0, self.grid.shape)
+        b = np.clip(self._cells(hi) - self.origin + 1, 0, self.grid.shape)
+        sub = self.grid[a[0]:b[0], a[1]:b[1], a[2]:b[2]]
+        idx = np.argwhere(sub >= self.l_occ) + a
+        return (idx + self.origin + 0.5) * self.voxel
+
+    def floor_slice(self, z_lo, z_hi):
+        # z 구간을 위에서 내려다본 2D 평면도: (state[x, y], (x0, y0) cm)
+        k0 = int(np.clip(np.floor(z_lo / self.voxel) - self.origin[2], 0, self.grid.shape[2]))
+        k1 = int(np.clip(np.floor(z_hi / self.voxel) - self.origin[2] + 1, 0, self.grid.shape[2]))
+        sub = self.grid[:, :, k0:k1]
+        if sub.shape[2] == 0:
+            plan = np.zeros(self.grid.shape[:2], dtype=np.int8)
+        else:
+            occ = (sub >= self.l_occ).any(axis=2)
+            free = (sub <= self.l_free).any(axis=2)
+            plan = np.where(occ, 1, np.where(free, -1, 0)).astype(np.int8)
+        return plan, self.origin[:2] * self.voxel
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+SENSOR_GRID = 8                                   # VL53L5CX 최대 해상도
+ELEVS_8X8 = [30, 15, 0, -15, -30, -45, -60, -75]  # 8×8 행별 고도각 (deg)
+RESOLUTIONS = (4, 8)
+
+
+# ============================================================
+# 해상도별 투영 테이블
+# ============================================================
+def sensor_tables(grid_size, fov_deg):
+    # 4×4 존은 8×8 존 2×2 를 묶은 것 → 행 고도각·열 방위각 모두 묶인 존들의 평균
+    # 반환: (행별 고도각 리스트, 첫 열~마지막 열 중심 사이 각도)
+    if grid_size not in RESOLUTIONS:
+        raise ValueError(f"unsupported grid size: {grid_size}")
+    b = SENSOR_GRID // grid_size
+    elevs = np.asarray(ELEVS_8X8, dtype=float).reshape(grid_size, b).mean(axis=1)
+    span = fov_deg * (SENSOR_GRID - b) / (SENSOR_GRID - 1)
+    return elevs.tolist(), span
+
+
+# ============================================================
+# 거리 배열 → 3D 좌표 (벡터화)
+# ============================================================
+def project_grid(dist_list_cm, az_center, elevs, fov_deg):
+    # 반환: (N, N, 3) 좌표 배열, 무효 셀(None / 0 이하)은 NaN
+    return project_frames(dist_list_cm, [az_center], elevs, fov_deg)[0]
+
+
+def project_frames(dist_cm, az_centers, elevs, fov_deg):
+    # 여러 프레임을 한 번에: (K, N*N) 거리 + (K,) 중심 방위각 → (K, N, N, 3)
+    n = len(elevs)
+    d = np.array(dist_cm, dtype=float).reshape(-1, n, n)
+    d[~(d > 0)] = np.nan
+
+    half_fov = fov_deg / 2.0
+    az = np.asarray(az_centers, dtype=float).reshape(-1, 1, 1)
+    az = np.radians(az - half_fov + np.arange(n) * fov_deg / (n - 1))
+    el = np.radians(np.asarray(elevs, dtype=float))[:, None]
+
+    x = d * np.sin(az) * np.cos(el)
+    y = d * np.cos(az) * np.cos(el)
+    z = d * np.sin(el)
+    return np.stack([x, y, z], axis=-1)
+
+
+def rotate_z(pts, yaw_deg):
+    # az 를 yaw_deg 만큼 증가시킨 것과 같은 z축 회전
+    a = np.radians(yaw_deg)
+    ca, sa = np.cos(a), np.sin(a)
+    out = np.array(pts, dtype=float, copy=True)
+    out[..., 0] = pts[..., 0] * ca + pts[..., 1] * sa
+    out[..., 1] = pts[..., 1] * ca - pts[..., 0] * sa
+    return out
+
+
+def _bend(grid_pts, axis):
+    # 세 점 (앞, 가운데, 뒤) 에서 가운데 점이 앞-뒤 현에서 벗어난 거리 / 현 길이, 가장자리는 0
+    p = np.moveaxis(grid_pts, axis, 0)
+    chord = p[2:] - p[:-2]
+    off = np.linalg.norm(np.cross(chord, p[1:-1] - p[:-2]), axis=-1)
+    sq = np.sum(chord * chord, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bend = off / sq
+    return np.moveaxis(np.pad(bend, [(1, 1)] + [(0, 0)] * (bend.ndim - 1)), 0, axis)
+
+
+def grid_normals(grid_pts, max_bend=0.1):
+    # 격자 이웃 차분으로 법선 추정, 센서(원점) 쪽을 향하도록 정렬
+    # 가로 이웃 세 점이 한 면 위에 있지 않은 점 (기둥 옆 깊이 경계, 방 모서리) 은 법선이 없으므로 NaN
+    # 세로 (벽/바닥 경계) 는 yaw 에 대한 정보가 많아서 그대로 둔다
+    du = np.gradient(grid_pts, axis=1)
+    dv = np.gradient(grid_pts, axis=0)
+    nrm = np.cross(du, dv)
+    length = np.linalg.norm(nrm, axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nrm = nrm / length
+        rough = _bend(grid_pts, 1) > max_bend
+    flip = np.sum(nrm * grid_pts, axis=-1) > 0
+    nrm[flip] *= -1
+    nrm[rough] = np.nan
+    return nrm
+
+
+def grid_quads(grid_pts, cells=None):
+    # 이웃한 네 점이 모두 유효한 칸만 사각형(면)으로 만든다 → (K, 4, 3)
+    # 앞쪽 차원이 더 있으면 (여러 프레임) 한 번에 처리, cells 로 칸을 더 거를 수 있음
+    quads = np.stack([
+        grid_pts[..., :-1, :-1, :],
+        grid_pts[..., :-1, 1:, :],
+        grid_pts[..., 1:, 1:, :],
+        grid_pts[..., 1:, :-1, :],
+    ], axis=-2)
+    ok = ~np.isnan(quads).any(axis=(-2, -1))
+    if cells is not None:
+        ok &= cells
+    return quads[ok]
@@ -0,0 +1,96 @@
+import numpy as np
+
+from projection import rotate_z
+from voxel_index import VoxelIndex
+
+
+# ============================================================
+# 프레임 → 누적 클라우드 증분 정합 (yaw 전용 point-to-plane)
+# ============================================================
+class ScanRegistration:
+    def __init__(self, max_yaw=3.0, coarse_step=1.0, iterations=8, max_dist=20.0,
+                 min_matches=8, trim=0.8, min_gain=0.5, min_slope=0.5, max_thickness=2.0):
+        # 프레임 점 간격(1.5 m 에서 ~20 cm)보다 넓게 대응점을 찾고, 잔차는 법선 방향만 본다
+        self.index = VoxelIndex(2.0 * max_dist)
+        self.max_yaw = max_yaw          # 명령 각도 주변 탐색 범위 (deg)
+        self.coarse_step = coarse_step  # 초기 추정용 거친 탐색 간격 (deg)
+        self.iterations = iterations
+        self.max_dist = max_dist        # 대응점 최대 거리 (cm)
+        self.min_matches = min_matches
+        self.trim = trim                # 잔차 작은 쪽 이 비율의 대응점만 평가 (가림/엣지 제외)
+        self.min_gain = min_gain        # 보정 후 비용이 0° 대비 이 비율 이상 줄어야 채택
+        self.min_slope = min_slope      # yaw 1° 에 잔차가 이만큼(cm) 이상 변하는 점만 사용
+        self.max_thickness = max_thickness  # 점들이 평면에서 이보다(cm, rms) 퍼진 복셀은 대응에서 제외
+
+    def reset(self):
+        self.index.reset()
+
+    def insert(self, pts, normals):
+        self.index.insert(pts, normals)
+
+    def _residuals(self, pts, yaw):
+        # 점마다 (point-to-plane 잔차 제곱, yaw 1° 당 잔차 변화), 대응점 없으면 inf
+        p = rotate_z(pts, yaw)
+        idx, _ = self.index.nearest(p, self.max_dist)
+        ok = idx >= 0
+        # 깊이 경계에서 앞/뒤 표면이 섞인 복셀은 평균 점·법선이 둘 다 아니라서 잔차가 치우친다
+        ok[ok] = self.index.sq_dist[idx[ok]] <= self.max_thickness ** 2
+        r2 = np.full(len(pts), np.inf)
+        j = np.zeros(len(pts))
+        p, n = p[ok], self.index.normals[idx[ok]]
+        r2[ok] = np.einsum('ij,ij->i', p - self.index.points[idx[ok]], n) ** 2
+        # az 증가에 대한 미분: d(x, y)/d(az) = (y, -x)
+        j[ok] = np.radians(n[:, 0] * p[:, 1] - n[:, 1] * p[:, 0])
+        return r2, j
+
+    def _costs(self, pts, cands):
+        # 모든 후보에서 대응된 점만 같은 집합으로 평균 → 후보마다 대응점 수가 달라서 생기는 치우침이 없다
+        # 바닥/천장처럼 yaw 로 잔차가 변하지 않는 점은 빼고,
+        # 가림/엣지처럼 어느 yaw 에서도 안 맞는 점은 잘라낸다 (trim)
+        res = [self._residuals(pts, y) for y in cands]
+        r2 = np.array([r for r, _ in res])
+        j = res[len(cands) // 2][1]
+        use = np.isfinite(r2).all(axis=0) & (np.abs(j) >= self.min_slope)
+        if use.sum() < self.min_matches:
+            return None
+        r2 = r2[:, use]
+        best = r2.min(axis=0)
+        k = max(self.min_matches, int(len(best) * self.trim))
+        keep = np.argsort(best)[:k]
+        return r2[:, keep].mean(axis=1)
+
+    # 반환: 명령 각도 대비 yaw 보정량 (deg), 정합 불가하면 0.0
+    def align(self, pts):
+        pts = np.asarray(pts, dtype=float)
+        if len(self.index) == 0 or len(pts) < self.min_matches:
+            return 0.0
+
+        # 1) 거친 탐색으로 초기값
+        steps = int(round(self.max_yaw / self.coarse_step))
+        cands = np.arange(-steps, steps + 1) * self.coarse_step
+        costs = self._costs(pts, cands)
+        if costs is None:
+            return 0.0
+        yaw = float(cands[int(np.argmin(costs))])
+
+        # 2) 최소점 주변 세 점에 포물선을 맞춰 간격을 줄여가며 정밀화
+        h = self.coarse_step
+        for _ in range(self.iterations):
+            c = self._costs(pts, [yaw - h, yaw, yaw + h])
+            if c is None:
+                break
+            curv = c[0] - 2.0 * c[1] + c[2]
+            if curv > 1e-12:
+                yaw += float(np.clip(h * (c[0] - c[2]) / (2.0 * curv), -h, h))
+            yaw = float(np.clip(yaw, -self.max_yaw, self.max_yaw))
+            h /= 2.0
+            if h < 0.01:
+                break
+
+        # 3) 0° 보다 확실히 나아질 때만 보정 (깨끗한 데이터에서 오차를 만들지 않도록)
+        if yaw == 0.0:
+            return 0.0
+        final = self._costs(pts, [0.0, yaw])
+        if final is None or not final[1] < (1.0 - self.min_gain) * final[0]:
+            return 0.0
+        return yaw
@@ -0,0 +1,59 @@
+import numpy as np
+
+from projection import grid_quads
+
+
+# ============================================================
+# 연속 매핑용 회전 링 버퍼 (최근 K 회전만 유지, 미리 할당)
+# ============================================================
+class RevolutionRing:
+    def __init__(self, revolutions, steps, grid_size, bg_alpha=None):
+        self.revolutions = revolutions
+        self.steps = steps
+        self.grids = np.full((revolutions, steps, grid_size, grid_size, 3), np.nan,
+                             dtype=np.float32)
+        # 프레임별 면 (간소화 후 개수가 달라서 최대 (N-1)² 개로 채우고 나머지는 NaN)
+        self.faces = np.full((revolutions, steps, (grid_size - 1) ** 2, 4, 3), np.nan,
+                             dtype=np.float32)
+        self.rev_ids = np.full(revolutions, -1, dtype=np.int64)   # 슬롯에 들어 있는 회전 번호
+
+        # 배경 모델: 스텝별 N×N 좌표의 지수 감쇠 평균 (bg_alpha 가 None 이면 사용 안 함)
+        self.bg_alpha = bg_alpha
+        self.background = None
+        if bg_alpha is not None:
+            self.background = np.full((steps, grid_size, grid_size, 3), np.nan, dtype=np.float32)
+
+    def add(self, rev, step, grid_pts, quads=None):
+        slot = rev % self.revolutions
+        if self.rev_ids[slot] != rev:
+            # 가장 오래된 회전을 비우고 재사용
+            self.grids[slot] = np.nan
+            self.faces[slot] = np.nan
+            self.rev_ids[slot] = rev
+        self.grids[slot, step] = grid_pts
+        if quads is None:
+            quads = grid_quads(grid_pts)
+        self.faces[slot, step] = np.nan
+        self.faces[slot, step, :len(quads)] = quads
+
+        if self.background is not None:
+            bg = self.background[step]
+            new = ~np.isnan(grid_pts)
+            fresh = new & np.isnan(bg)
+            bg[fresh] = grid_pts[fresh]
+            blend = new & ~fresh
+            bg[blend] += self.bg_alpha * (grid_pts[blend] - bg[blend])
+
+    def points(self):
+        pts = self.grids.reshape(-1, 3)
+        return pts[~np.isnan(pts[:, 0])]
+
+    def quads(self):
+        faces = self.faces.reshape(-1, 4, 3)
+        return faces[~np.isnan(faces[:, 0, 0])]
+
+    def background_points(self):
+        if self.background is None:
+            return np.empty((0, 3), dtype=np.float32)
+        pts = self.background.reshape(-1, 3)
+        return pts[~np.isnan(pts[:, 0])]
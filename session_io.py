@@ -0,0 +1,70 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from frame_ring import SLOT_DTYPE
+
+
+META_FILE = "meta.json"
+FRAMES_FILE = "frames.bin"
+FRAME_DTYPE = SLOT_DTYPE    # 파일 레코드 = 링 슬롯 그대로 (거리 uint16 mm)
+
+
+# ============================================================
+# 세션 기록: 디렉터리 하나 = meta.json + frames.bin (고정 길이 레코드)
+# ============================================================
+class SessionRecorder:
+    def __init__(self, root, meta):
+        base = os.path.join(root, time.strftime("scan_%Y%m%d_%H%M%S"))
+        self.path, k = base, 1
+        while os.path.exists(self.path):
+            self.path = f"{base}_{k}"
+            k += 1
+        os.makedirs(self.path)
+
+        meta = dict(meta, created=time.time(), record_size=FRAME_DTYPE.itemsize)
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=1)
+        self.f = open(os.path.join(self.path, FRAMES_FILE), "ab")
+        self.count = 0
+
+    def write(self, slot):
+        self.f.write(slot.tobytes())
+        self.count += 1
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# ============================================================
+# 세션 읽기 (memmap: 필요한 레코드만 디스크에서 읽힘)
+# ============================================================
+def read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def open_frames(path):
+    fname = os.path.join(path, FRAMES_FILE)
+    # 기록 중 끊긴 마지막 레코드는 버린다
+    count = os.path.getsize(fname) // FRAME_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=FRAME_DTYPE)
+    return np.memmap(fname, dtype=FRAME_DTYPE, mode="r", shape=(count,))
+
+
+def list_sessions(root):
+    names = sorted(os.listdir(root))
+    return [os.path.join(root, n) for n in names
+            if os.path.isfile(os.path.join(root, n, META_FILE))]
+
+
+def depths_cm(frames, grid_size, mm_per_cm=10.0):
+    # 레코드들 → (K, N*N) 거리 cm, 무효(0) 는 NaN
+    grid = frames["grid"][:, :grid_size * grid_size]
+    return np.where(grid > 0, grid / mm_per_cm, np.nan)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 저장소 최상위 모듈 (projection, registration, ...) 을 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from projection import sensor_tables
+
+
+# ============================================================
+# 테스트용 합성 장면: 직육면체 방 (+ 선택적으로 기둥) 에 광선 투사
+# ============================================================
+def ray_dirs(az_center, grid_size=8, fov_deg=60.0):
+    elevs, span = sensor_tables(grid_size, fov_deg)
+    n = grid_size
+    az = np.radians(az_center - span / 2.0 + np.arange(n) * span / (n - 1))[None, :]
+    el = np.radians(np.asarray(elevs))[:, None]
+    return np.stack([np.sin(az) * np.cos(el),
+                     np.cos(az) * np.cos(el),
+                     np.sin(el) * np.ones_like(az)], axis=-1)
+
+
+def room_depths(az_center, grid_size=8, fov_deg=60.0, half=(300.0, 200.0),
+                floor=-40.0, ceiling=160.0, pillar=None):
+    # half: 방 x/y 반폭 (cm), pillar: (x, y, 반폭) 세로 기둥 → (N*N,) 거리 cm
+    u = ray_dirs(az_center, grid_size, fov_deg)
+    t = np.full(u.shape[:2], np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis, w in ((0, half[0]), (1, half[1])):
+            t = np.minimum(t, np.where(u[..., axis] != 0, w / np.abs(u[..., axis]), np.inf))
+        t = np.minimum(t, np.where(u[..., 2] < 0, floor / u[..., 2], np.inf))
+        t = np.minimum(t, np.where(u[..., 2] > 0, ceiling / u[..., 2], np.inf))
+        if pillar is not None:
+            px, py, pw = pillar
+            # y = py 평면의 정면만 (센서 쪽을 향하는 면)
+            tp = np.where(u[..., 1] * py > 0, py / u[..., 1], np.inf)
+            hit = (np.abs(tp * u[..., 0] - px) <= pw) & (tp < t)
+            t = np.where(hit, tp, t)
+    return t.reshape(-1)
@@ -0,0 +1,155 @@
+import queue
+
+import numpy as np
+import pytest
+
+from acquisition import ScanSequencer, run_acquisition
+from frame_ring import FrameRing
+from session_io import read_meta, open_frames
+from uart_tokenizer import LineTokenizer
+
+
+# ============================================================
+# 가짜 UART: 보낸 줄을 기록하고, 넣어 준 바이트를 토크나이저로 돌려준다
+# ============================================================
+class FakeUART:
+    def __init__(self):
+        self.tokenizer = LineTokenizer()
+        self.pending = b""
+        self.sent = []
+
+    def feed(self, data):
+        self.pending += data
+
+    def read_lines(self):
+        data, self.pending = self.pending, b""
+        return self.tokenizer.feed(data)
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+
+def frame_line(value, n=8):
+    return (",".join([str(value)] * (n * n)) + "\n").encode()
+
+
+def drain(events):
+    out = []
+    while True:
+        try:
+            out.append(events.get_nowait())
+        except queue.Empty:
+            return out
+
+
+def fire(seq):
+    # 예약된 MeS/SC 를 시간 기다리지 않고 바로 실행
+    timers, seq.timers = seq.timers, []
+    for _, fn in timers:
+        fn()
+
+
+def params(S=4, **kw):
+    p = {"S": S, "continuous": False, "rounds": 0, "grid_size": 8, "fov": 60.0,
+         "span": 60.0, "rel_thresh": 0.15, "min_step": 1.0}
+    p.update(kw)
+    return p
+
+
+@pytest.fixture
+def rig():
+    ring = FrameRing(slots=16)
+    alg, mes = FakeUART(), FakeUART()
+    events = queue.Queue()
+    yield ScanSequencer(ring, events, alg, mes), ring, alg, mes, events
+    ring.close()
+
+
+def step(seq, alg, mes, value):
+    # 모터 MF → (지연 후) MeS → 측정 프레임 → (지연 후) 다음 SC
+    alg.feed(b"MF\n")
+    seq.poll()
+    fire(seq)
+    assert mes.sent[-1] == "MeS\n"
+    mes.feed(frame_line(value))
+    seq.poll()
+    fire(seq)
+
+
+def test_uniform_scan_writes_frames_and_ends_with_rm(rig):
+    seq, ring, alg, mes, events = rig
+    seq.start(params(S=4))
+    assert mes.sent == ["RES 8\n"]
+    assert alg.sent == ["90.000\n"]
+
+    for k in range(4):
+        step(seq, alg, mes, 1000 + k)
+
+    assert ring.latest() == 4
+    for k in range(4):
+        slot = ring.read(k + 1)
+        assert slot["angle"] == 90.0 * k and slot["index"] == k
+        assert (slot["grid"] == 1000 + k).all()
+    assert alg.sent == ["90.000\n"] * 4 + ["RM\n"]
+
+    kinds = [e[0] for e in drain(events)]
+    assert kinds.count("progress") == 4 and kinds[-1] == "scan_done"
+
+    # RF 를 기다리는 동안 측정 줄은 읽지 않는다
+    mes.feed(frame_line(5))
+    seq.poll()
+    assert ring.latest() == 4
+    alg.feed(b"RF\n")
+    seq.poll()
+    assert drain(events) == [("rf",)]
+
+
+def test_stop_finishes_after_current_step(rig):
+    seq, ring, alg, mes, events = rig
+    seq.start(params(S=8))
+    step(seq, alg, mes, 1000)
+    seq.stop()
+    step(seq, alg, mes, 1000)
+    assert ring.latest() == 2
+    assert alg.sent[-1] == "RM\n"
+    assert ("scan_done",) in drain(events)
+
+
+def test_short_and_garbled_frames_are_not_written(rig):
+    seq, ring, alg, mes, events = rig
+    seq.start(params(S=4))
+    alg.feed(b"MF\n")
+    seq.poll()
+    mes.feed(b"1,2,3\n\xff\xfe" + frame_line(1500))
+    seq.poll()
+    assert ring.latest() == 1
+    assert (ring.read(1)["grid"] == 1500).all()
+    assert mes.tokenizer.stats["short_frames"] == 1
+
+
+def test_session_is_recorded(rig, tmp_path):
+    seq, ring, alg, mes, events = rig
+    seq.start(params(S=4, record_dir=str(tmp_path)))
+    path = [e[1] for e in drain(events) if e[0] == "session"][0]
+    for k in range(4):
+        step(seq, alg, mes, 2000 + k)
+    assert seq.recorder is None     # RM 과 함께 닫힘
+
+    meta = read_meta(path)
+    assert meta["grid_size"] == 8 and meta["S"] == 4
+    frames = open_frames(path)
+    np.testing.assert_array_equal(frames["angle"], [0.0, 90.0, 180.0, 270.0])
+    np.testing.assert_array_equal(frames["grid"][:, 0], [2000, 2001, 2002, 2003])
+
+
+def test_run_acquisition_reports_error_instead_of_dying_silently():
+    ring = FrameRing(slots=4)
+    events = queue.Queue()
+    try:
+        run_acquisition(ring.name, queue.Queue(), events, port_alg="/nonexistent/tty0")
+        kind, msg = drain(events)[-1]
+        assert kind == "error" and msg
+        # 수집 쪽 close 가 GUI 쪽 링을 지우지 않는다
+        assert ring.write(0.0, 0, 8, np.zeros(64, dtype=np.uint16)) == 1
+    finally:
+        ring.close()
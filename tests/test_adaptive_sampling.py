@@ -0,0 +1,72 @@
+import numpy as np
+
+from adaptive_sampling import interval_scores, plan_refinement, order_for_travel
+from projection import sensor_tables
+from scene import room_depths
+
+
+ELEVS, SPAN = sensor_tables(8, 60.0)
+PILLAR = (-15.0, 150.0, 40.0)     # 오른쪽 모서리가 방위각 ~9.5°
+
+
+def frames(angles, **scene):
+    return np.array([room_depths(a, **scene).reshape(8, 8) for a in angles])
+
+
+def test_uniform_sweep_of_static_room_needs_nothing():
+    a = np.arange(0.0, 360.0, 20.0)
+    mid, gap, score = interval_scores(a, frames(a), SPAN)
+    np.testing.assert_allclose(mid, a + 10.0)
+    np.testing.assert_allclose(gap, 20.0)
+    assert (score == 0).all()
+    assert plan_refinement(a, frames(a), SPAN) == []
+
+
+def test_mid_direction_maps_to_nearest_column_of_each_frame():
+    # 0° / 20° 사이 중간 10° → 왼쪽 프레임 5번 열 (12.9°), 오른쪽 프레임 2번 열 (7.1°)
+    a = np.array([0.0, 20.0])
+    d = frames(a)
+    for frame, col, hit in ((0, 5, True), (1, 2, True), (0, 4, False), (1, 3, False)):
+        e = d.copy()
+        e[frame, :, col] = np.nan
+        score = interval_scores(a, e, SPAN)[2][0]
+        assert score == (1.0 if hit else 0.0)
+
+
+def test_depth_edge_between_frames_is_refined():
+    a = np.arange(0.0, 360.0, 20.0)
+    d = frames(a, pillar=PILLAR)
+    mid, _, score = interval_scores(a, d, SPAN)
+    # 기둥 모서리가 두 열 사이에 걸친 구간만 점수가 있다 (벽/기둥 행 3개)
+    assert score[mid == 10.0] == 3 / 8
+    assert (score[mid != 10.0] == 0).all()
+    assert plan_refinement(a, d, SPAN) == [10.0]
+    # 이미 충분히 좁은 구간은 더 쪼개지 않는다
+    assert plan_refinement(a, d, SPAN, min_step=10.5) == []
+
+
+def test_gap_wider_than_fov_is_always_refined_first():
+    a = np.array([0.0, 90.0, 100.0])
+    mid, gap, score = interval_scores(a, frames(a, pillar=PILLAR), SPAN)
+    np.testing.assert_allclose(gap, [90.0, 10.0, 260.0])
+    assert score[0] >= 1.0 and score[2] >= 1.0
+    assert score[1] < 1.0
+    # 점수 순 (미관측 구간 먼저), max_extra 로 잘림
+    assert plan_refinement(a, frames(a), SPAN, max_extra=2) == [45.0, 230.0]
+
+
+def test_interval_wraps_around_360():
+    a = np.array([10.0, 180.0, 350.0])
+    mid, gap, score = interval_scores(a, frames(a), SPAN)
+    np.testing.assert_allclose(mid, [95.0, 265.0, 0.0])
+    np.testing.assert_allclose(gap, [170.0, 170.0, 20.0])
+    assert score[2] == 0
+    # 한 프레임뿐이면 한 바퀴 전체가 한 구간
+    mid, gap, score = interval_scores([30.0], frames([30.0]), SPAN)
+    assert mid[0] == 210.0 and gap[0] == 360.0 and score[0] >= 1.0
+
+
+def test_order_for_travel_goes_forward_from_current_angle():
+    assert order_for_travel([10.0, 290.0, 310.0, 100.0], 300.0) == [310.0, 10.0, 100.0, 290.0]
+    assert order_for_travel([45.0, 5.0], 0.0) == [5.0, 45.0]
+    assert order_for_travel([], 120.0) == []
@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+
+from batch_reprocess import main, RESULT_FILE
+from frame_ring import SLOT_DTYPE
+from session_io import SessionRecorder
+from scene import room_depths
+
+
+def write_frames(rec, angles):
+    for a in angles:
+        slot = np.zeros(1, dtype=SLOT_DTYPE)[0]
+        slot["seq"], slot["angle"], slot["index"], slot["grid_size"] = rec.count + 1, a, rec.count, 8
+        slot["grid"][:64] = np.rint(room_depths(a) * 10)
+        rec.write(slot)
+    rec.flush()
+
+
+def run(capsys, root, *args):
+    # 반환: (처리된 수, 건너뛴 수), 마지막 요약 줄에서
+    assert main([str(root), "-j", "1", *args]) == 0
+    last = capsys.readouterr().out.strip().splitlines()[-1].split()
+    return int(last[0]), int(last[2])
+
+
+def result(path):
+    with open(os.path.join(path, "processed", RESULT_FILE)) as f:
+        return json.load(f)
+
+
+def test_process_skip_force_and_growing_session(tmp_path, capsys):
+    # 아직 기록 중인 세션 (recorder 가 열려 있음)
+    rec = SessionRecorder(str(tmp_path), {"grid_size": 8, "S": 24, "fov_deg": 60.0})
+    write_frames(rec, np.arange(0.0, 90.0, 15.0))
+
+    assert run(capsys, tmp_path) == (1, 0)
+    assert result(rec.path)["frames"] == 6
+    assert run(capsys, tmp_path) == (0, 1)
+    assert run(capsys, tmp_path, "--force") == (1, 0)
+    # 다른 파라미터는 다시 처리
+    assert run(capsys, tmp_path, "--mesh-tol", "2.0") == (1, 0)
+
+    # 부분 처리 뒤에 입력이 늘면 같은 파라미터라도 다시 처리
+    write_frames(rec, np.arange(90.0, 180.0, 15.0))
+    rec.close()
+    assert run(capsys, tmp_path, "--mesh-tol", "2.0") == (1, 0)
+    res = result(rec.path)
+    assert res["frames"] == 12 and res["faces"] > 0
+    assert run(capsys, tmp_path, "--mesh-tol", "2.0") == (0, 1)
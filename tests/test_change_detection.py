@@ -0,0 +1,67 @@
+import numpy as np
+
+from change_detection import diff_sessions
+from frame_ring import SLOT_DTYPE
+from session_io import SessionRecorder
+from scene import room_depths
+
+
+def record(root, angles, grid_size=8, **scene):
+    # 합성 방을 찍은 세션 하나 기록 → 세션 디렉터리
+    rec = SessionRecorder(str(root), {"grid_size": grid_size, "S": len(angles), "fov_deg": 60.0})
+    for k, a in enumerate(angles):
+        slot = np.zeros(1, dtype=SLOT_DTYPE)[0]
+        slot["seq"], slot["angle"], slot["index"], slot["grid_size"] = k + 1, a, k, grid_size
+        depth = room_depths(a, grid_size, **scene)
+        slot["grid"][:grid_size ** 2] = np.rint(depth * 10).clip(0, 65535)
+        rec.write(slot)
+    rec.close()
+    return rec.path
+
+
+def steps(S, offset=0.0):
+    return offset + np.arange(S) * 360.0 / S
+
+
+def assert_no_change(report, changed, removed):
+    assert report["pixels"]["changed"] == 0
+    assert report["rays"]["added"] == 0 and report["rays"]["removed"] == 0
+    assert len(changed) == 0 and len(removed) == 0
+
+
+def test_static_scene_with_different_step_counts_is_unchanged(tmp_path):
+    ref = record(tmp_path, steps(8))
+    cur = record(tmp_path, steps(6))
+    report, changed, removed = diff_sessions(ref, cur)
+    assert report["frames"]["matched"] == 2     # 0°, 180° 만 겹침
+    assert report["rays"]["compared"] > 0
+    assert_no_change(report, changed, removed)
+
+
+def test_static_scene_with_offset_steps_is_unchanged(tmp_path):
+    ref = record(tmp_path, steps(8))
+    cur = record(tmp_path, steps(8, offset=10.0))
+    report, changed, removed = diff_sessions(ref, cur)
+    assert report["frames"]["matched"] == 0
+    assert_no_change(report, changed, removed)
+
+
+def test_resolution_change_is_compared_by_rays_only(tmp_path):
+    ref = record(tmp_path, steps(8))
+    cur = record(tmp_path, steps(12, offset=5.0), grid_size=4)
+    report, changed, removed = diff_sessions(ref, cur)
+    assert report["frames"]["matched"] == 0 and report["pixels"]["compared"] == 0
+    # 거친 4×4 광선은 8×8 기준으로 전부 설명된다
+    assert report["rays"]["added"] == 0 and len(changed) == 0
+
+
+def test_new_object_is_reported_between_steps(tmp_path):
+    ref = record(tmp_path, steps(8))
+    cur = record(tmp_path, steps(8, offset=10.0), pillar=(0.0, 150.0, 40.0))
+    report, changed, removed = diff_sessions(ref, cur)
+    assert report["rays"]["added"] > 0
+    # 새로 표시된 점은 기둥 앞면 (y = 150) 위
+    np.testing.assert_allclose(changed[:, 1], 150.0, atol=1.0)
+    # 기준 쪽에서는 기둥에 가려진 벽/바닥이 사라진 곳
+    assert report["rays"]["removed"] > 0
+    assert (removed[:, 1] > 150.0).all()
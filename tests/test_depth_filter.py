@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from depth_filter import filter_depth
+from projection import sensor_tables
+from scene import room_depths
+
+
+PILLAR = (0.0, 150.0, 40.0)
+
+
+def faces(az, grid_size=8, **scene):
+    elevs, _ = sensor_tables(grid_size, 60.0)
+    depth = room_depths(az, grid_size, **scene).reshape(grid_size, grid_size)
+    return filter_depth(depth, elevs)
+
+
+# 4×4 는 비스듬한 벽 구석 픽셀이 이웃과 10% 넘게 달라서 이상치로 빠지는 경우가 있다
+@pytest.mark.parametrize("grid_size, frac", [(8, 1.0), (4, 0.9)])
+def test_clean_room_keeps_faces(grid_size, frac):
+    elevs, _ = sensor_tables(grid_size, 60.0)
+    floor = np.asarray(elevs[:-1]) <= -15.0
+    kept = total = 0
+    for az in np.arange(0.0, 360.0, 7.5):
+        _, ok = faces(az, grid_size)
+        # 비스듬한 바닥 띠 (-15°/-30° 행 포함) 는 한 번도 버려지지 않는다
+        assert ok[floor].all()
+        kept += ok.sum()
+        total += ok.size
+    assert kept >= frac * total
+
+
+def test_pillar_edges_are_removed():
+    depth, ok = faces(0.0, pillar=PILLAR)
+    d = room_depths(0.0, pillar=PILLAR).reshape(8, 8)
+    front = d < room_depths(0.0).reshape(8, 8) - 1.0
+    # 네 꼭짓점이 기둥/뒤 벽에 섞인 칸은 면을 만들지 않고, 한쪽에만 걸친 칸은 남는다
+    mixed = np.stack([front[:-1, :-1], front[:-1, 1:], front[1:, :-1], front[1:, 1:]], axis=-1)
+    mixed = mixed.any(axis=-1) & ~mixed.all(axis=-1)
+    # 기둥 밑동 (기둥 / 바닥) 은 이어진 면이라 제외
+    side = mixed & (front[:-1, :-1] != front[:-1, 1:])
+    assert side.any()
+    assert not ok[side].any()
+    assert ok[~mixed].all()
+
+
+def test_floor_only_4x4_survives():
+    # 바닥만 보이는 장면, 위쪽 행은 무효
+    elevs, _ = sensor_tables(4, 60.0)
+    depth = room_depths(0.0, 4, half=(1e6, 1e6), ceiling=1e6).reshape(4, 4)
+    depth[depth > 1e4] = np.nan
+    _, ok = filter_depth(depth, elevs)
+    rows = ~np.isnan(depth[:-1, 0]) & ~np.isnan(depth[1:, 0])
+    assert rows.sum() == 2
+    assert ok[rows].all() and not ok[~rows].any()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from frame_ring import FrameRing
+
+
+@pytest.fixture
+def ring():
+    r = FrameRing(slots=4)
+    yield r
+    r.close()
+
+
+def test_write_read_valid(ring):
+    assert ring.latest() == 0
+    assert ring.read(1) is None
+    seq = ring.write(12.5, 3, 4, np.arange(16, dtype=np.uint16), t=100.0)
+    assert seq == 1 and ring.latest() == 1
+
+    slot = ring.read(seq)
+    assert slot["angle"] == 12.5 and slot["index"] == 3 and slot["t"] == 100.0
+    assert slot["grid_size"] == 4
+    np.testing.assert_array_equal(slot["grid"][:16], np.arange(16))
+    assert not slot["grid"][16:].any()      # 4×4 는 앞 16칸만
+    assert ring.valid(seq)
+
+
+def test_attach_by_name_sees_same_frames(ring):
+    ring.write(1.0, 0, 8, np.full(64, 7, dtype=np.uint16))
+    other = FrameRing(name=ring.name)
+    try:
+        assert len(other) == len(ring) and other.latest() == 1
+        assert (other.read(1)["grid"] == 7).all()
+        other.write(2.0, 1, 8, np.zeros(64, dtype=np.uint16))
+        assert ring.latest() == 2
+    finally:
+        other.close()
+
+
+def test_wrap_around_reuses_slots(ring):
+    for k in range(1, 11):
+        assert ring.write(float(k), k, 8, np.full(64, k, dtype=np.uint16)) == k
+    # 마지막 4개만 남아 있다
+    for seq in range(7, 11):
+        slot = ring.read(seq)
+        assert slot is not None and slot["angle"] == seq and (slot["grid"] == seq).all()
+    for seq in range(1, 7):
+        assert ring.read(seq) is None
+
+
+def test_overwrite_while_reading_is_detected(ring):
+    ring.write(1.0, 0, 8, np.ones(64, dtype=np.uint16))
+    view = ring.read(1)
+    assert view is not None
+    # 읽는 쪽이 뷰를 들고 있는 동안 쓰는 쪽이 한 바퀴 돌아 같은 슬롯을 덮어씀
+    for k in range(len(ring)):
+        ring.write(2.0, k, 8, np.full(64, 2, dtype=np.uint16))
+    assert not ring.valid(1)
+    assert view["seq"] == 1 + len(ring)
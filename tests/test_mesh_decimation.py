@@ -0,0 +1,85 @@
+import numpy as np
+
+from mesh_decimation import AngularCoverage, cell_mask, merge_coplanar, merge_coplanar_frames
+from projection import project_grid, sensor_tables
+from scene import room_depths
+
+
+ELEVS, SPAN = sensor_tables(8, 60.0)
+SWEEP = np.arange(0.0, 360.0, 7.5)
+
+
+def cover(cov, angles, depth_fn=room_depths):
+    # 각도마다 cull → 남은 칸 수 (띠별 합) 와 면
+    kept = np.zeros((7, 7), dtype=int)
+    quads = []
+    for a in angles:
+        g = project_grid(depth_fn(a), a, ELEVS, SPAN)
+        cells = cov.cull(cell_mask(g), a, SPAN, g)
+        kept += cells
+        quads.extend(merge_coplanar(g, 1.0, cells))
+    return kept, np.array(quads)
+
+
+def test_repeated_sweep_of_same_scene_is_culled():
+    cov = AngularCoverage(7, tol=1.0)
+    first, _ = cover(cov, SWEEP)
+    again, _ = cover(cov, SWEEP + 3.75)
+    # 평평한 바닥 띠는 전부 버려지고, 남는 건 벽/바닥 경계처럼 평면이 아닌 칸뿐
+    assert again[3:].sum() == 0
+    assert again.sum() < 0.2 * 49 * len(SWEEP)
+    assert again.sum() < first.sum()
+
+
+def test_changed_depth_is_kept_even_when_covered():
+    pillar = (0.0, 150.0, 40.0)
+    cov = AngularCoverage(7, tol=1.0)
+    cover(cov, SWEEP)
+    plain = cover(AngularCoverage(7, tol=1.0), [3.75])[0]   # 비교용 (빈 coverage)
+    kept, _ = cover(cov, [3.75], lambda a: room_depths(a, pillar=pillar))
+    assert kept.sum() > 0
+    # 기둥이 가린 칸 (네 꼭짓점 모두 기둥) 은 반드시 남는다
+    d = room_depths(3.75).reshape(8, 8)
+    dp = room_depths(3.75, pillar=pillar).reshape(8, 8)
+    moved = dp < d - 1.0
+    on_pillar = moved[:-1, :-1] & moved[:-1, 1:] & moved[1:, :-1] & moved[1:, 1:]
+    assert on_pillar.any()
+    assert (kept.astype(bool) | ~on_pillar).all()
+    assert plain.sum() >= kept.sum()
+
+
+def test_first_seen_error_is_not_permanent():
+    cov = AngularCoverage(7, tol=1.0)
+    cover(cov, [0.0], lambda a: room_depths(a) * 1.1)     # 처음 프레임이 10% 길게 찍힘
+    kept, _ = cover(cov, [0.0])
+    assert kept[3:].all()
+    # 고친 값이 기준이 되어 다시 찍으면 버려진다
+    kept, _ = cover(cov, [0.0])
+    assert kept[3:].sum() == 0
+
+
+def test_merge_coplanar_frames_joins_floor_across_frames():
+    # 바닥만 있는 장면
+    def floor(a):
+        d = room_depths(a, half=(1e6, 1e6), ceiling=1e6)
+        return np.where(d < 1e4, d, np.nan)
+    _, quads = cover(AngularCoverage(7, tol=1.0), np.arange(0.0, 120.0, 7.5), floor)
+    merged = merge_coplanar_frames(quads, 1.0)
+    assert 0 < len(merged) < len(quads) / 2
+    # 병합 면의 꼭짓점은 원래 꼭짓점 중에서만 나오고 바닥 위에 있다
+    orig = {tuple(v) for v in quads.reshape(-1, 3).round(6)}
+    assert all(tuple(v) in orig for v in merged.reshape(-1, 3).round(6))
+    np.testing.assert_allclose(merged[..., 2], -40.0, atol=1e-6)
+
+
+def test_merge_coplanar_frames_keeps_wall_corner():
+    _, quads = cover(AngularCoverage(7, tol=1.0), np.arange(20.0, 100.0, 7.5))
+    merged = merge_coplanar_frames(quads, 1.0)
+    az = np.degrees(np.arctan2(merged[..., 0], merged[..., 1]))
+    corner = np.degrees(np.arctan2(300.0, 200.0))
+    # 새로 합쳐진 면 중 벽 띠 (네 꼭짓점이 바닥 위) 면은 방 모서리를 가로지르지 않는다
+    orig = {q.round(6).tobytes() for q in quads}
+    new = np.array([q.round(6).tobytes() not in orig for q in merged])
+    wall = new & (merged[..., 2] > -40.0 + 1e-6).all(axis=1)
+    assert wall.any()
+    assert not ((az[wall, 0] < corner - 1.0) & (az[wall, 1] > corner + 1.0)).any()
@@ -0,0 +1,37 @@
+import numpy as np
+
+from occupancy import OccupancyMap
+from projection import project_grid, sensor_tables
+from scene import room_depths
+
+
+ELEVS, SPAN = sensor_tables(8, 60.0)
+
+
+def test_far_reading_does_not_grow_grid_past_max_range():
+    occ = OccupancyMap(voxel=5.0, max_range=400.0)
+    # 65535 mm 로 잘린 값 = 6553.5 cm
+    for _ in range(2):
+        occ.integrate((0, 0, 0), [[6553.5, 6553.5, 0.0]])
+    assert max(occ.grid.shape) * occ.voxel <= 2 * 400.0 + 4 * occ.voxel
+    # 잘린 광선은 빈칸으로만 반영, 점유 셀은 없다
+    assert not occ.occ.any()
+    assert occ.is_free([[100.0, 100.0, 0.0]]).all()
+
+
+def test_incremental_occupied_cache_matches_grid():
+    occ = OccupancyMap(voxel=5.0, extent=100.0)
+    for a in range(0, 360, 10):
+        g = project_grid(room_depths(a), a, ELEVS, SPAN)
+        occ.integrate((0, 0, 0), g[~np.isnan(g[..., 0])])
+        np.testing.assert_array_equal(occ.occ, occ.grid >= occ.l_occ)
+
+
+def test_raycast_hits_wall():
+    occ = OccupancyMap(voxel=5.0)
+    for _ in range(3):
+        for a in range(0, 360, 10):
+            g = project_grid(room_depths(a), a, ELEVS, SPAN)
+            occ.integrate((0, 0, 0), g[~np.isnan(g[..., 0])])
+    d = occ.raycast((0, 0, 0), [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]])
+    np.testing.assert_allclose(d, [200.0, 300.0], atol=2 * occ.voxel)
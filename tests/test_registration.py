@@ -0,0 +1,73 @@
+import numpy as np
+
+from projection import project_grid, grid_normals, sensor_tables, rotate_z
+from registration import ScanRegistration
+from scene import room_depths
+
+
+ELEVS, SPAN = sensor_tables(8, 60.0)
+PILLAR = (0.0, 150.0, 40.0)
+
+
+def frame(true_az, cmd_az, **scene):
+    g = project_grid(room_depths(true_az, **scene), cmd_az, ELEVS, SPAN)
+    return g, ~np.isnan(g[..., 0])
+
+
+def insert(reg, g, valid):
+    reg.insert(g[valid], grid_normals(g)[valid])
+
+
+def test_noise_free_frames_get_no_correction():
+    reg = ScanRegistration()
+    for k in range(72):
+        g, v = frame(k * 5.0, k * 5.0)
+        yaw = reg.align(g[v])
+        assert abs(yaw) < 0.1
+        insert(reg, rotate_z(g, yaw), v)
+
+
+def test_foreground_object_does_not_bias_yaw():
+    # 기둥 앞면과 뒤쪽 벽이 같은 복셀에 섞여도 깨끗한 프레임을 틀어서는 안 된다
+    for step in (10.0, 5.0):
+        reg = ScanRegistration()
+        off = 0.0
+        for k in range(int(360 / step)):
+            g, v = frame(k * step, k * step + off, pillar=PILLAR)
+            yaw = reg.align(g[v])
+            off += yaw
+            insert(reg, rotate_z(g, yaw), v)
+            assert abs(off) < 0.2
+
+
+def test_injected_offset_is_recovered():
+    reg = ScanRegistration()
+    for a in range(0, 360, 5):
+        insert(reg, *frame(a, a))
+    recovered = 0
+    for a in np.arange(2.5, 360, 15):
+        for off in (-2.0, -1.0, 1.5):
+            g, v = frame(a + off, a)
+            yaw = reg.align(g[v])
+            # 보정이 오차를 키우면 안 된다 (정합을 못 하면 0)
+            assert abs(yaw - off) <= abs(off)
+            recovered += abs(yaw - off) < 0.2
+    assert recovered >= 0.8 * 24 * 3
+
+
+def test_step_noise_does_not_drift_more_than_without_registration():
+    rng = np.random.default_rng(0)
+    reg = ScanRegistration()
+    true = off = 0.0
+    err_reg, err_raw = [], []
+    for k in range(72):
+        cmd = k * 5.0
+        if k:
+            true += 5.0 + rng.uniform(-1.0, 1.0)
+        g, v = frame(true, cmd + off)
+        yaw = reg.align(g[v])
+        off += yaw
+        insert(reg, rotate_z(g, yaw), v)
+        err_reg.append(abs(cmd + off - true))
+        err_raw.append(abs(cmd - true))
+    assert max(err_reg) < max(err_raw)
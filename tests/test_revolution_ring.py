@@ -0,0 +1,64 @@
+import numpy as np
+
+from projection import project_grid, grid_quads, sensor_tables
+from revolution_ring import RevolutionRing
+from scene import room_depths
+
+
+ELEVS, SPAN = sensor_tables(8, 60.0)
+K, S = 3, 8
+
+
+def grid(step, shift=0.0):
+    a = step * 360.0 / S
+    return project_grid(room_depths(a), a, ELEVS, SPAN) + shift
+
+
+def test_memory_stays_flat_and_slots_are_reused():
+    ring = RevolutionRing(K, S, 8)
+    arrays = (ring.grids, ring.faces)
+    nbytes = ring.grids.nbytes + ring.faces.nbytes
+    for rev in range(10):
+        for step in range(S):
+            ring.add(rev, step, grid(step, shift=rev))
+        # 미리 할당한 배열을 그대로 덮어쓴다
+        assert ring.grids is arrays[0] and ring.faces is arrays[1]
+        assert ring.grids.nbytes + ring.faces.nbytes == nbytes
+        assert len(ring.points()) == min(rev + 1, K) * S * 64
+    assert sorted(ring.rev_ids.tolist()) == [7, 8, 9]
+    assert ring.rev_ids[9 % K] == 9
+    # 남은 점은 마지막 K 회전 것뿐 (회전마다 x 를 rev 만큼 밀어 둠)
+    kept = {int(round(float(ring.grids[slot, 0, 0, 0, 0] - grid(0)[0, 0, 0]))) for slot in range(K)}
+    assert kept == {7, 8, 9}
+
+
+def test_faces_of_reused_slot_are_cleared():
+    ring = RevolutionRing(K, S, 8)
+    full = grid_quads(grid(0))
+    for step in range(S):
+        ring.add(0, step, grid(step), full)
+    assert len(ring.quads()) == S * len(full)
+
+    # 같은 슬롯을 쓰는 K 회전 뒤: 한 스텝만, 면도 더 적게
+    ring.add(K, 0, grid(0), full[:2])
+    assert ring.rev_ids[0] == K
+    assert len(ring.quads()) == 2
+    assert len(ring.points()) == 64
+    # 같은 회전·스텝을 다시 쓰면 이전 면은 남지 않는다
+    ring.add(K, 0, grid(0), full[:1])
+    assert len(ring.quads()) == 1
+
+
+def test_background_blends_towards_new_frames():
+    ring = RevolutionRing(K, S, 8, bg_alpha=0.25)
+    g = grid(0)
+    ring.add(0, 0, g)
+    np.testing.assert_allclose(ring.background[0], g, rtol=1e-6)
+    # 새 값 쪽으로 bg_alpha 만큼, 회전이 슬롯에서 밀려나도 배경은 남는다
+    for rev in range(1, 2 * K):
+        ring.add(rev, 0, g + 8.0)
+    expected = g + 8.0 * (1.0 - 0.75 ** (2 * K - 1))
+    np.testing.assert_allclose(ring.background[0], expected, rtol=1e-5)
+    assert len(ring.background_points()) == 64
+    # 아직 못 본 스텝은 비어 있다
+    assert np.isnan(ring.background[1]).all()
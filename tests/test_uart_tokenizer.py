@@ -0,0 +1,58 @@
+from uart_tokenizer import LineTokenizer
+
+
+def test_partial_tail_is_kept_for_next_feed():
+    tok = LineTokenizer()
+    assert tok.feed(b"MF\n1,2,") == ["MF"]
+    assert tok.buf == b"1,2,"
+    assert tok.feed(b"3\r\nRF\n") == ["1,2,3", "RF"]
+    assert tok.stats["lines"] == 3
+    assert tok.stats["resyncs"] == 0
+
+
+def test_garbage_prefix_is_stripped_not_dropped():
+    tok = LineTokenizer()
+    assert tok.feed(b"\x00\x001,2,3\n") == ["1,2,3"]
+    assert tok.feed(b"\xff\xfe1,2,3\n") == ["1,2,3"]
+    assert tok.feed(b"4,5\xff6,7\n") == ["6,7"]
+    assert tok.stats["resyncs"] == 3
+
+
+def test_garbage_only_line_is_dropped():
+    tok = LineTokenizer()
+    assert tok.feed(b"\xff\xfe\x00\nMF\n") == ["MF"]
+    assert tok.stats["resyncs"] == 1
+
+
+def test_over_long_line_without_newline_is_discarded():
+    tok = LineTokenizer(max_line=16)
+    assert tok.feed(b"x" * 20) == []
+    assert tok.buf == b""
+    assert tok.stats["resyncs"] == 1
+    assert tok.feed(b"1,2\n") == ["1,2"]
+
+
+def test_over_long_line_with_newline_is_discarded():
+    tok = LineTokenizer(max_line=16)
+    assert tok.feed(b"1," * 10 + b"\nMF\n") == ["MF"]
+    assert tok.stats["resyncs"] == 1
+
+
+def test_parse_frame_counters():
+    tok = LineTokenizer()
+    assert tok.parse_frame("MF", 4) is None
+    assert tok.stats == dict(tok.stats, frames=0, short_frames=0, parse_failures=0)
+
+    assert tok.parse_frame("10,20,30,40", 4) == [1.0, 2.0, 3.0, 4.0]
+    assert tok.parse_frame("10,20,30,40", 4, mm_per_cm=1.0) == [10.0, 20.0, 30.0, 40.0]
+    assert tok.stats["frames"] == 2
+
+    assert tok.parse_frame("10,20,30", 4) is None
+    assert tok.stats["short_frames"] == 1
+
+    assert tok.parse_frame("10,20,30,40,50", 4) is None
+    assert tok.stats["parse_failures"] == 1
+
+    assert tok.parse_frame("10,x,30,40", 4) == [1.0, None, 3.0, 4.0]
+    assert tok.stats["parse_failures"] == 2
+    assert tok.stats["frames"] == 3
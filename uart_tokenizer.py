@@ -0,0 +1,83 @@
+import re
+
+
+# 마지막 쓰레기 바이트 (출력 가능한 ASCII 가 아닌 것) 까지의 앞부분
+_GARBAGE_PREFIX = re.compile(rb".*[^\x20-\x7e]", re.S)
+
+
+# ============================================================
+# UART 바이트 스트림 → 줄 단위 토큰 (한 번에 in_waiting 전부 처리)
+# ============================================================
+class LineTokenizer:
+    def __init__(self, max_line=1024):
+        self.max_line = max_line    # 개행 없이 이보다 길면 쓰레기로 보고 버림
+        self.buf = bytearray()      # 줄 끝이 아직 안 온 꼬리를 보관 (재사용)
+        self.stats = {
+            "bytes": 0,
+            "lines": 0,
+            "frames": 0,
+            "short_frames": 0,
+            "parse_failures": 0,
+            "resyncs": 0,
+        }
+
+    def feed(self, data):
+        if not data:
+            return []
+        self.stats["bytes"] += len(data)
+        self.buf += data
+
+        end = self.buf.rfind(b"\n")
+        if end < 0:
+            if len(self.buf) > self.max_line:
+                # 개행이 안 오는 쓰레기 → 버리고 다음 개행부터 다시 동기화
+                self.buf.clear()
+                self.stats["resyncs"] += 1
+            return []
+
+        chunk = bytes(self.buf[:end])
+        del self.buf[:end + 1]
+
+        lines = []
+        for raw in chunk.split(b"\n"):
+            raw = raw.strip()
+            if not raw:
+                continue
+            # 줄 안에 쓰레기 바이트가 있으면 마지막 쓰레기 뒤부터 다시 동기화
+            bad = _GARBAGE_PREFIX.match(raw)
+            if bad is not None:
+                raw = raw[bad.end():].strip()
+                self.stats["resyncs"] += 1
+                if not raw:
+                    continue
+            if len(raw) > self.max_line:
+                self.stats["resyncs"] += 1
+                continue
+            lines.append(raw.decode("ascii"))
+        self.stats["lines"] += len(lines)
+        return lines
+
+    def parse_frame(self, line, n_cells, mm_per_cm=10.0):
+        # "d0,d1,...,dN-1" (mm) → cm 리스트, 형식이 안 맞으면 None
+        parts = line.split(",")
+        if len(parts) == 1:
+            return None             # 프레임이 아닌 제어 토큰 (MF, RF, ...)
+        if len(parts) < n_cells:
+            self.stats["short_frames"] += 1
+            return None
+        if len(parts) > n_cells:
+            self.stats["parse_failures"] += 1
+            return None
+
+        dist_list_cm = []
+        bad = False
+        for x in parts:
+            try:
+                dist_list_cm.append(float(x) / mm_per_cm)
+            except ValueError:
+                dist_list_cm.append(None)
+                bad = True
+        if bad:
+            self.stats["parse_failures"] += 1
+        self.stats["frames"] += 1
+        return dist_list_cm
@@ -3,12 +3,15 @@ import math
 import serial
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QGridLayout
+    QPushButton, QLabel, QLineEdit, QGridLayout, QComboBox
 )
 from PyQt5.QtCore import QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from uart_tokenizer import LineTokenizer
+from projection import sensor_tables, RESOLUTIONS
+
 
 # ===============================================================
 # 기본 설정
@@ -20,6 +23,7 @@ PORT_MOTOR = "/dev/ttyAMA2"   # Atmega128
 PORT_STM32 = "/dev/ttyAMA3"   # STM32
 
 BAUD = 115200
+RES_CMD = "RES {n}\n"       # STM32 에 해상도 변경 요청
 
 
 # ===============================================================
@@ -40,9 +44,14 @@ class GraphWindow(QWidget):
         self.setLayout(layout)
 
         self.az_center = 0.0
-        self.elevs = [30, 15, 0, -15, -30, -45, -60, -75]
+        self.set_grid_size(GRID_SIZE)
         self.reset_axis()
 
+    def set_grid_size(self, n):
+        # 행 고도각 / 열 방위각 범위는 해상도마다 다름
+        self.grid_size = n
+        self.elevs, self.fov = sensor_tables(n, FOV_DEG)
+
     def reset_axis(self):
         self.ax.cla()
         self.ax.set_xlim(-10, 10)
@@ -54,18 +63,19 @@ class GraphWindow(QWidget):
         self.ax.view_init(elev=20, azim=-60)
 
     def update_plot(self, dist_list_cm):
-        if len(dist_list_cm) != GRID_SIZE**2:
+        n = self.grid_size
+        if len(dist_list_cm) != n**2:
             return
 
-        half_fov = FOV_DEG / 2.0
-        azims = [self.az_center - half_fov + i * FOV_DEG / (GRID_SIZE-1)
-                 for i in range(GRID_SIZE)]
+        half_fov = self.fov / 2.0
+        azims = [self.az_center - half_fov + i * self.fov / (n-1)
+                 for i in range(n)]
 
         pts = []
 
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                dist = dist_list_cm[r*GRID_SIZE + c]
+        for r in range(n):
+            for c in range(n):
+                dist = dist_list_cm[r*n + c]
                 if dist is None:
                     continue
 
@@ -88,27 +98,36 @@ class GraphWindow(QWidget):
 
 
 # ===============================================================
-# 8×8 Distance GUI
+# N×N Distance GUI
 # ===============================================================
 class DistanceWindow(QWidget):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("8 × 8 Distance Array (cm)")
         self.setGeometry(200, 200, 400, 400)
 
-        layout = QGridLayout()
-        self.labels = [[QLabel("0.0") for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                layout.addWidget(self.labels[r][c], r, c)
-
-        self.setLayout(layout)
+        self.grid_layout = QGridLayout()
+        self.setLayout(self.grid_layout)
+        self.labels = []
+        self.set_grid_size(GRID_SIZE)
+
+    def set_grid_size(self, n):
+        # 해상도가 바뀌면 라벨을 다시 만든다
+        for row in self.labels:
+            for label in row:
+                self.grid_layout.removeWidget(label)
+                label.deleteLater()
+        self.grid_size = n
+        self.setWindowTitle(f"{n} × {n} Distance Array (cm)")
+        self.labels = [[QLabel("0.0") for _ in range(n)] for _ in range(n)]
+
+        for r in range(n):
+            for c in range(n):
+                self.grid_layout.addWidget(self.labels[r][c], r, c)
 
     def update_distances(self, dist_list_cm):
         for i, val in enumerate(dist_list_cm):
-            r = i // GRID_SIZE
-            c = i % GRID_SIZE
+            r = i // self.grid_size
+            c = i % self.grid_size
 
             if val is None:
                 self.labels[r][c].setText("∞")
@@ -122,15 +141,16 @@ class DistanceWindow(QWidget):
 class UARTDevice:
     def __init__(self, port, baud=115200):
         self.ser = serial.Serial(port, baudrate=baud, timeout=0.01)
+        self.tokenizer = LineTokenizer()
 
-    def read_line(self):
+    # 쌓여 있는 바이트를 한 번에 읽어서 완성된 줄들만 반환
+    def read_lines(self):
         try:
-            line = self.ser.readline().decode(errors="ignore").strip()
-            if line == "":
-                return None
-            return line
-        except:
-            return None
+            n = self.ser.in_waiting
+            data = self.ser.read(n) if n else b""
+        except (serial.SerialException, OSError):   # 장치가 빠지면 ioctl 이 EIO
+            return []
+        return self.tokenizer.feed(data)
 
     def send(self, msg):
         print(f"TX({self.ser.port}): {msg.strip()}")
@@ -156,6 +176,12 @@ class MainController(QWidget):
         self.s_edit.setPlaceholderText("Enter sample count S")
         layout.addWidget(self.s_edit)
 
+        # 센서 해상도 (START 할 때 적용)
+        self.res_combo = QComboBox()
+        for n in sorted(RESOLUTIONS, reverse=True):
+            self.res_combo.addItem(f"{n}x{n}", n)
+        layout.addWidget(self.res_combo)
+
         self.start_btn = QPushButton("START ALL PROCESS")
         layout.addWidget(self.start_btn)
 
@@ -179,6 +205,7 @@ class MainController(QWidget):
         self.S = 0
         self.C = 0
         self.SC = 0.0
+        self.grid_size = GRID_SIZE
         self.motor_active = False
 
         self.measure_active = False
@@ -204,6 +231,12 @@ class MainController(QWidget):
         self.motor_active = True
         self.measure_active = False
 
+        # 해상도 적용: 센서 설정 → 파서/투영/표 모두 같은 N 사용
+        self.grid_size = self.res_combo.currentData()
+        self.graph_win.set_grid_size(self.grid_size)
+        self.distance_win.set_grid_size(self.grid_size)
+        self.uart_stm32.send(RES_CMD.format(n=self.grid_size))
+
         self.status_label.setText("Motor rotation started")
 
         # 첫 step 전달
@@ -222,8 +255,7 @@ class MainController(QWidget):
     # -----------------------------------------------------------
     def update_loop(self):
         # ------------------ MOTOR UART ------------------
-        msg = self.uart_motor.read_line()
-        if msg:
+        for msg in self.uart_motor.read_lines():
             print(f"[Motor RX] {msg}")
 
             if msg == "MF" and self.motor_active:
@@ -246,16 +278,20 @@ class MainController(QWidget):
                 print("Motor RF received")
                 self.motor_active = False
 
+            # ------------------ reset done  ------------------
+            elif msg == "reset done":
+                print("All process finished")
+                self.status_label.setText("All process finished")
+
         # ------------------ STM32 UART ------------------
-        data = self.uart_stm32.read_line()
-        if data:
+        for data in self.uart_stm32.read_lines():
             print(f"[STM32 RX] {data}")
 
             if data == "measure done":
                 print("Measurement Finished!")
 
                 # 버퍼에 저장된 마지막측정값 플로팅
-                if len(self.measure_buffer) == 64:
+                if len(self.measure_buffer) == self.grid_size**2:
                     self.graph_win.update_plot(self.measure_buffer)
                     self.distance_win.update_distances(self.measure_buffer)
 
@@ -266,25 +302,12 @@ class MainController(QWidget):
 
             else:
                 # CSV 데이터 처리
-                parts = data.split(",")
-                if len(parts) == 64:
-                    tmp = []
-                    for x in parts:
-                        try:
-                            tmp.append(float(x) / 10.0)
-                        except:
-                            tmp.append(None)
-
+                tmp = self.uart_stm32.tokenizer.parse_frame(data, self.grid_size**2)
+                if tmp is not None:
                     self.measure_buffer = tmp
                     self.graph_win.update_plot(tmp)
                     self.distance_win.update_distances(tmp)
 
-        # ------------------ reset done  ------------------
-        msg2 = self.uart_motor.read_line()
-        if msg2 == "reset done":
-            print("All process finished")
-            self.status_label.setText("All process finished")
-
     # -----------------------------------------------------------
     def start(self):
         self.show()
@@ -0,0 +1,118 @@
+import numpy as np
+
+
+_BITS = 21
+_OFF = 1 << (_BITS - 1)
+_MASK = (1 << _BITS) - 1
+
+
+def pack_cells(cells):
+    # (M, 3) 정수 셀 좌표 → int64 키 (축마다 21비트)
+    c = (np.asarray(cells, dtype=np.int64) + _OFF) & _MASK
+    return (c[:, 0] << (2 * _BITS)) | (c[:, 1] << _BITS) | c[:, 2]
+
+
+# ============================================================
+# 정렬된 복셀 해시 인덱스 (증분 삽입 + 벡터화 최근접 탐색)
+# ============================================================
+class VoxelIndex:
+    def __init__(self, voxel=2.0, max_count=32):
+        self.voxel = float(voxel)
+        self.max_count = max_count   # 평균 가중치 상한 (오래된 값도 갱신되도록)
+        # 점이 속한 옥탄트 쪽 2×2×2 복셀만 보면 voxel/2 이내 이웃은 빠짐없이 찾는다
+        self.offsets = np.array([(i, j, k) for i in (0, 1) for j in (0, 1) for k in (0, 1)],
+                                dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.points = np.empty((0, 3))
+        self.normals = np.empty((0, 3))
+        self.counts = np.empty(0, dtype=np.int64)
+        self.sq_dist = np.empty(0)   # 복셀 평면까지 점 거리 제곱 평균 (표면이 섞이면 커짐)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def cells(self, pts):
+        return np.floor(np.asarray(pts) / self.voxel).astype(np.int64)
+
+    def insert(self, pts, normals=None):
+        pts = np.asarray(pts, dtype=float)
+        if normals is None:
+            normals = np.zeros_like(pts)
+        ok = ~(np.isnan(pts).any(axis=1) | np.isnan(normals).any(axis=1))
+        pts, normals = pts[ok], normals[ok]
+        if len(pts) == 0:
+            return
+
+        # 같은 복셀로 들어온 점들은 먼저 합친다
+        ukeys, inv = np.unique(pack_cells(self.cells(pts)), return_inverse=True)
+        cnt = np.bincount(inv)
+        psum = np.zeros((len(ukeys), 3))
+        nsum = np.zeros((len(ukeys), 3))
+        np.add.at(psum, inv, pts)
+        np.add.at(nsum, inv, normals)
+
+        pos = np.searchsorted(self.keys, ukeys)
+        hit = pos < len(self.keys)
+        hit[hit] = self.keys[pos[hit]] == ukeys[hit]
+        w0 = np.zeros(len(ukeys))
+        w0[hit] = self.counts[pos[hit]]
+
+        # 기존 복셀: 누적 평균 갱신
+        if hit.any():
+            i = pos[hit]
+            w = self.counts[i][:, None]
+            self.points[i] = (self.points[i] * w + psum[hit]) / (w + cnt[hit][:, None])
+            nrm = self.normals[i] * w + nsum[hit]
+            self.normals[i] = _normalize(nrm)
+            self.counts[i] = np.minimum(self.counts[i] + cnt[hit], self.max_count)
+
+        # 새 복셀: 정렬 순서를 유지하며 삽입 (전체 재구성 없음)
+        new = ~hit
+        if new.any():
+            at = pos[new]
+            self.keys = np.insert(self.keys, at, ukeys[new])
+            self.points = np.insert(self.points, at, psum[new] / cnt[new][:, None], axis=0)
+            self.normals = np.insert(self.normals, at, _normalize(nsum[new]), axis=0)
+            self.counts = np.insert(self.counts, at, np.minimum(cnt[new], self.max_count))
+            self.sq_dist = np.insert(self.sq_dist, at, 0.0)
+
+        # 들어온 점들의 (갱신된) 복셀 평면 거리로 두께 누적
+        # 기둥 앞면과 뒤 벽처럼 법선이 같아도 깊이가 다른 표면이 섞인 복셀은 여기서 드러난다
+        at = np.searchsorted(self.keys, ukeys)
+        r2 = np.einsum('ij,ij->i', pts - self.points[at[inv]], self.normals[at[inv]]) ** 2
+        self.sq_dist[at] = (self.sq_dist[at] * w0 + np.bincount(inv, weights=r2)) / (w0 + cnt)
+
+    def nearest(self, pts, max_dist=None):
+        # 반환: (인덱스, 거리), voxel/2 이내에 없으면 인덱스 -1
+        pts = np.asarray(pts, dtype=float)
+        best_i = np.full(len(pts), -1, dtype=np.int64)
+        best_d = np.full(len(pts), np.inf)
+        if len(self.keys) == 0 or len(pts) == 0:
+            return best_i, best_d
+
+        base = np.floor(pts / self.voxel - 0.5).astype(np.int64)
+        last = len(self.keys) - 1
+        for off in self.offsets:
+            k = pack_cells(base + off)
+            pos = np.minimum(np.searchsorted(self.keys, k), last)
+            hit = self.keys[pos] == k
+            d = np.where(hit, np.linalg.norm(self.points[pos] - pts, axis=1), np.inf)
+            better = d < best_d
+            best_d[better] = d[better]
+            best_i[better] = pos[better]
+
+        limit = self.voxel / 2.0 if max_dist is None else min(max_dist, self.voxel / 2.0)
+        far = best_d > limit
+        if far.any():
+            best_i[far] = -1
+            best_d[far] = np.inf
+        return best_i, best_d
+
+
+def _normalize(v):
+    length = np.linalg.norm(v, axis=1, keepdims=True)
+    length[length == 0] = 1.0
+    return v / length